@@ -7,7 +7,9 @@ No HTTP, no SQL — only pure domain logic.
 import csv
 import io
 import json
-from datetime import datetime
+import time
+from datetime import datetime, date as dt_date
+from operator import itemgetter
 
 try:
     import openpyxl
@@ -15,6 +17,14 @@ try:
 except ImportError:
     HAS_OPENPYXL = False
 
+try:
+    # Rust-backed XLSX reader — much faster than openpyxl for big exports.
+    # Optional: openpyxl remains the fallback when it isn't installed.
+    from python_calamine import CalamineWorkbook
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
 import database as db
 
 
@@ -71,20 +81,40 @@ TAG_GROUPS = [
 ]
 
 
+# get_tag_groups runs on nearly every page render but tag config only
+# changes through the settings screen, so the merged list is memoized.
+# Tag-config writes bump the generation counter to invalidate it.
+_tag_config_generation = 0
+_tag_groups_memo = (-1, None)  # (generation, result)
+
+
+def bump_tag_config_generation():
+    """Invalidate memoized tag groups after a tag-config write."""
+    global _tag_config_generation
+    _tag_config_generation += 1
+
+
 def get_tag_groups():
     """
     Return TAG_GROUPS with tags replaced by any custom DB config.
     Falls back to hardcoded defaults for groups not yet configured.
     """
+    global _tag_groups_memo
+    gen, cached = _tag_groups_memo
+    if gen == _tag_config_generation:
+        return cached
+
     custom = db.get_tag_config()  # {group_id: [tag, ...]} or None
     if not custom:
-        return TAG_GROUPS
-    result = []
-    for g in TAG_GROUPS:
-        merged = dict(g)
-        if g["id"] in custom:
-            merged["tags"] = custom[g["id"]]
-        result.append(merged)
+        result = TAG_GROUPS
+    else:
+        result = []
+        for g in TAG_GROUPS:
+            merged = dict(g)
+            if g["id"] in custom:
+                merged["tags"] = custom[g["id"]]
+            result.append(merged)
+    _tag_groups_memo = (_tag_config_generation, result)
     return result
 
 
@@ -436,30 +466,134 @@ def compute_combined_day_score(day_score_json, trades):
 REQUIRED_COLUMNS = {"B/S", "avgPrice", "filledQty", "Fill Time", "Date"}
 
 
-def parse_uploaded_file(filename: str, file_bytes: bytes) -> list:
+def parse_uploaded_file(filename: str, file_data) -> list:
+    """file_data is either raw bytes or a binary file-like object.
+
+    Uploads come through as Werkzeug's spooled stream so large files are
+    parsed straight off disk instead of being read into RAM first; the
+    bytes form is kept for callers that already hold the content.
+    """
     ext = filename.rsplit(".", 1)[-1].lower()
 
     if ext == "csv":
-        text = file_bytes.decode("utf-8-sig", errors="replace")
-        reader = csv.DictReader(io.StringIO(text))
-        rows = list(reader)
+        # The quote fast path needs the whole byte string to scan; stream
+        # input goes straight to the csv.reader branch, which handles
+        # quoting anyway and never materializes the file.
+        if isinstance(file_data, bytes) and b'"' not in file_data:
+            # Fast path: broker exports never quote fields, so a plain
+            # split(",") per line replaces the csv module's quoting state
+            # machine. (The 0x22 quote byte can't occur inside a UTF-8
+            # multibyte sequence, so scanning raw bytes is equivalent to
+            # scanning the decoded text.)
+            text = file_data.decode("utf-8-sig", errors="replace")
+            lines = text.splitlines()
+            headers = lines[0].split(",") if lines else []
+            _check_columns(headers)
+            fills = _collect_fills_csv((line.split(",") for line in lines[1:]), headers)
+        else:
+            # Stream-decode: TextIOWrapper feeds csv.reader chunk-wise rather
+            # than holding the file as bytes plus one giant decoded str.
+            raw = io.BytesIO(file_data) if isinstance(file_data, bytes) else file_data
+            buf = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+            reader = csv.reader(buf)
+            headers = next(reader, [])
+            _check_columns(headers)
+            fills = _collect_fills_csv(reader, headers)
     elif ext in ("xlsx", "xls"):
-        if not HAS_OPENPYXL:
+        stream = io.BytesIO(file_data) if isinstance(file_data, bytes) else file_data
+        if HAS_CALAMINE:
+            # Calamine returns computed values (same semantic as data_only=True)
+            wb = CalamineWorkbook.from_filelike(stream)
+            sheet = wb.get_sheet_by_index(0)
+            rows_iter = iter(sheet.to_python(skip_empty_area=True))
+            headers = [str(v).strip() if v else "" for v in next(rows_iter, [])]
+            _check_columns(headers)
+            fills = _collect_fills(dict(zip(headers, row)) for row in rows_iter)
+        elif HAS_OPENPYXL:
+            # read_only streams rows via SAX instead of materializing the whole
+            # workbook; values_only skips Cell object allocation entirely.
+            wb = openpyxl.load_workbook(stream, data_only=True, read_only=True)
+            try:
+                rows_iter = wb.active.iter_rows(values_only=True)
+                headers = [str(v).strip() if v else "" for v in next(rows_iter, [])]
+                _check_columns(headers)
+                fills = _collect_fills(dict(zip(headers, row)) for row in rows_iter)
+            finally:
+                wb.close()  # read-only mode keeps the zip handle open until closed
+        else:
             raise ValueError("openpyxl is required for Excel. Run: pip install openpyxl")
-        wb = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
-        ws = wb.active
-        headers = [str(c.value).strip() if c.value else "" for c in next(ws.iter_rows(max_row=1))]
-        rows = [dict(zip(headers, row)) for row in ws.iter_rows(min_row=2, values_only=True)]
     else:
         raise ValueError(f"Unsupported file type: .{ext}. Upload CSV or XLSX.")
 
-    if not rows:
-        raise ValueError("File is empty.")
+    if not fills:
+        raise ValueError("No valid fills found in file.")
+
+    return fills
+
 
-    missing = REQUIRED_COLUMNS - set(rows[0].keys())
+def _check_columns(headers) -> None:
+    if not headers:
+        raise ValueError("File is empty.")
+    missing = REQUIRED_COLUMNS - set(headers)
     if missing:
         raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
 
+
+def _collect_fills_csv(reader, headers) -> list:
+    """CSV variant of _collect_fills working on raw csv.reader rows.
+
+    DictReader builds a dict per row just so we can pull out five fields;
+    resolving the column indices once and indexing each row directly skips
+    that allocation entirely. CSV values are always str, so no coercion
+    wrappers are needed before the numeric/date parsers.
+    """
+    i_side  = headers.index("B/S")
+    i_price = headers.index("avgPrice")
+    i_qty   = headers.index("filledQty")
+    i_time  = headers.index("Fill Time")
+    i_date  = headers.index("Date")
+
+    fills = []
+    for row in reader:
+        try:
+            side, fill_time = row[i_side], row[i_time]
+            if not fill_time or not side:
+                continue
+            fills.append({
+                "side":  side.strip(),
+                "qty":   int(float(row[i_qty])),
+                "price": float(row[i_price]),
+                "time":  _parse_fill_time(fill_time),
+                "date":  _parse_date(row[i_date]),
+            })
+        except (ValueError, IndexError):
+            continue
+    return fills
+
+
+def _to_int(v):
+    """Coerce a cell value to int without a pointless str round trip.
+
+    The XLSX readers hand back real ints/floats; only str cells need the
+    float() hop (to survive values like "2.0").
+    """
+    if isinstance(v, int):
+        return v
+    if isinstance(v, str):
+        return int(float(v))
+    return int(v)
+
+
+def _to_float(v):
+    return v if isinstance(v, float) else float(v)
+
+
+def _collect_fills(rows) -> list:
+    """Filter and convert rows in a single streaming pass.
+
+    Only the (much smaller) fill dicts are ever held in memory — the raw
+    rows flow through one at a time, whatever the source iterator is.
+    """
     fills = []
     for r in rows:
         if not r.get("Fill Time") or not r.get("B/S"):
@@ -467,23 +601,29 @@ def parse_uploaded_file(filename: str, file_bytes: bytes) -> list:
         try:
             fills.append({
                 "side":  str(r["B/S"]).strip(),
-                "qty":   int(float(str(r["filledQty"]))),
-                "price": float(r["avgPrice"]),
+                "qty":   _to_int(r["filledQty"]),
+                "price": _to_float(r["avgPrice"]),
                 "time":  _parse_fill_time(str(r["Fill Time"])),
                 "date":  _parse_date(str(r["Date"])),
             })
         except (ValueError, KeyError, TypeError):
             continue
+    return fills
 
-    if not fills:
-        raise ValueError("No valid fills found in file.")
 
-    return fills
+# Hoisted so the format tuples aren't rebuilt once per fill.
+_FILL_TIME_FORMATS = ("%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%m/%d/%y %H:%M:%S")
+_DATE_FORMATS      = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y")
 
 
 def _parse_fill_time(raw: str) -> str:
     raw = raw.strip()
-    for fmt in ("%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%m/%d/%y %H:%M:%S"):
+    # Fast path: both common exports are 19 chars with the time at [11:]
+    # ('MM/DD/YYYY HH:MM:SS' or 'YYYY-MM-DD HH:MM:SS'), so a couple of
+    # character checks replace a strptime/strftime round trip per fill.
+    if len(raw) == 19 and raw[13] == ":" and raw[16] == ":" and (raw[2] == "/" or raw[4] == "-"):
+        return raw[11:]
+    for fmt in _FILL_TIME_FORMATS:
         try:
             return datetime.strptime(raw, fmt).strftime("%H:%M:%S")
         except ValueError:
@@ -494,7 +634,14 @@ def _parse_fill_time(raw: str) -> str:
 
 def _parse_date(raw: str) -> str:
     raw = raw.strip().split()[0]
-    for fmt in ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y"):
+    # Fast path for the two 10-char layouts; anything odd falls through
+    # to strptime for real validation.
+    if len(raw) == 10:
+        if raw[4] == "-" and raw[7] == "-":
+            return raw
+        if raw[2] == "/" and raw[5] == "/":
+            return f"{raw[6:]}-{raw[:2]}-{raw[3:5]}"
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(raw, fmt).strftime("%Y-%m-%d")
         except ValueError:
@@ -504,44 +651,63 @@ def _parse_date(raw: str) -> str:
 
 # ── Trade Reconstruction ──────────────────────────────────────────────────────
 
+_FILL_TIME_KEY = itemgetter("time")
+
+
 def reconstruct_trades(fills: list) -> list:
     """Group fills by date → reconstruct round-trip trades per date."""
     by_date: dict = {}
     for f in fills:
         by_date.setdefault(f["date"], []).append(f)
 
-    return [
-        {"date": date, "trades": _build_round_trips(sorted(day_fills, key=lambda x: x["time"]))}
-        for date, day_fills in sorted(by_date.items())
-    ]
+    result = []
+    for date, day_fills in sorted(by_date.items()):
+        # Broker exports are almost always already in fill order — a linear
+        # sortedness check is cheaper than an unconditional key-function sort.
+        times = [f["time"] for f in day_fills]
+        if any(times[i] > times[i + 1] for i in range(len(times) - 1)):
+            day_fills.sort(key=_FILL_TIME_KEY)
+        result.append({"date": date, "trades": _build_round_trips(day_fills)})
+    return result
 
 
 def _build_round_trips(fills: list) -> list:
     position = 0
     current  = []
     trades   = []
+    # Accumulate the buy/sell sums while scanning so _compute_stats doesn't
+    # need a second pass over the same fills.
+    buy_qty = buy_val = sell_qty = sell_val = 0
+    current_append = current.append  # bound once — this loop is the import hot path
 
     for f in fills:
-        position += f["qty"] if f["side"] == "Buy" else -f["qty"]
-        current.append(f)
+        qty   = f["qty"]
+        price = f["price"]
+        if f["side"] == "Buy":
+            position += qty
+            buy_qty  += qty
+            buy_val  += qty * price
+        else:
+            position -= qty
+            sell_qty += qty
+            sell_val += qty * price
+        current_append(f)
         if position == 0:
-            trades.append(_compute_stats(current, len(trades) + 1))
+            trades.append(_compute_stats(current, len(trades) + 1,
+                                         buy_qty, buy_val, sell_qty, sell_val))
             current = []
+            current_append = current.append
+            buy_qty = buy_val = sell_qty = sell_val = 0
 
     if current:  # unclosed position
-        trades.append(_compute_stats(current, len(trades) + 1))
+        trades.append(_compute_stats(current, len(trades) + 1,
+                                     buy_qty, buy_val, sell_qty, sell_val))
 
     return trades
 
 
-def _compute_stats(fills: list, trade_num: int) -> dict:
-    buy_qty = buy_val = sell_qty = sell_val = 0
-    for f in fills:
-        if f["side"] == "Buy":
-            buy_qty += f["qty"];  buy_val  += f["qty"] * f["price"]
-        else:
-            sell_qty += f["qty"]; sell_val += f["qty"] * f["price"]
-
+def _compute_stats(fills: list, trade_num: int,
+                   buy_qty, buy_val, sell_qty, sell_val) -> dict:
     is_short  = fills[0]["side"] == "Sell"
     qty       = max(buy_qty, sell_qty)
 
@@ -581,23 +747,16 @@ def save_day_trades(date: str, trades: list, account_id=None) -> int:
         db.delete_day(existing["id"])
 
     day_id = db.upsert_day(date, account_id)
-
-    for t in trades:
-        trade_id = db.insert_trade(
-            day_id, t["trade_num"], t["direction"], t["qty"],
-            t["avg_entry"], t["avg_exit"], t["pnl"],
-            t["entry_time"], t["exit_time"],
-            is_open=t.get("open", False)
-        )
-        for f in t["fills"]:
-            db.insert_fill(trade_id, f["time"], f["side"], f["qty"], f["price"])
-
+    db.insert_day_trades_bulk(day_id, trades)
     return day_id
 
 
-def import_file(filename: str, file_bytes: bytes, account_id=None) -> dict:
-    """Full pipeline: parse → reconstruct → save. Returns summary dict."""
-    fills     = parse_uploaded_file(filename, file_bytes)
+def import_file(filename: str, file_data, account_id=None) -> dict:
+    """Full pipeline: parse → reconstruct → save. Returns summary dict.
+
+    file_data: raw bytes or a binary file-like (see parse_uploaded_file).
+    """
+    fills     = parse_uploaded_file(filename, file_data)
     day_trades = reconstruct_trades(fills)
 
     saved = []
@@ -631,26 +790,70 @@ DEFAULT_TRADE_DEFAULTS = {
 }
 
 
+# Prebuilt results for the uncustomized case — most installs never override
+# these, so the getters can hand back the same dict instead of rebuilding
+# one per call. Callers treat getter results as read-only.
+_FROZEN_TRADE_DEFAULTS = dict(DEFAULT_TRADE_DEFAULTS)
+_FROZEN_INSTRUMENT_CONFIG = {
+    inst: {
+        "dollars_per_point": float(d["dollars_per_point"]),
+        "dollars_per_tick":  float(d["dollars_per_tick"]),
+        "ticks_per_point":   int(d["ticks_per_point"]),
+    }
+    for inst, d in INSTRUMENT_CONFIG.items()
+}
+
+# Config rarely changes but is read on nearly every request, so both getters
+# keep their last result for a few seconds instead of re-querying the DB.
+# Settings routes call invalidate_config_cache() after any write so the next
+# read sees fresh values immediately.
+_CONFIG_CACHE_TTL = 5.0
+_config_cache = {}  # key → (expires_at, value)
+
+
+def invalidate_config_cache():
+    """Drop cached config so the next getter call re-reads the DB."""
+    _config_cache.clear()
+
+
+def _cached_config(key, build):
+    entry = _config_cache.get(key)
+    now = time.monotonic()
+    if entry and entry[0] > now:
+        return entry[1]
+    value = build()
+    _config_cache[key] = (now + _CONFIG_CACHE_TTL, value)
+    return value
+
+
 def get_trade_defaults():
     """Get trade default settings, merging DB config over hardcoded defaults."""
-    config = db.get_all_config()
-    result = {}
-    for key, default_val in DEFAULT_TRADE_DEFAULTS.items():
-        result[key] = config.get(f"td_{key}", default_val)
-    return result
+    def build():
+        config = db.get_all_config()
+        if not any(k.startswith("td_") for k in config):
+            return _FROZEN_TRADE_DEFAULTS
+        result = {}
+        for key, default_val in DEFAULT_TRADE_DEFAULTS.items():
+            result[key] = config.get(f"td_{key}", default_val)
+        return result
+    return _cached_config("trade_defaults", build)
 
 
 def get_instrument_config():
     """Get instrument tick values, with DB overrides."""
-    config = db.get_all_config()
-    result = {}
-    for inst, defaults in INSTRUMENT_CONFIG.items():
-        result[inst] = {
-            "dollars_per_point": float(config.get(f"inst_{inst}_dpp", defaults["dollars_per_point"])),
-            "dollars_per_tick":  float(config.get(f"inst_{inst}_dpt", defaults["dollars_per_tick"])),
-            "ticks_per_point":   int(config.get(f"inst_{inst}_tpp",  defaults["ticks_per_point"])),
-        }
-    return result
+    def build():
+        config = db.get_all_config()
+        if not any(k.startswith("inst_") for k in config):
+            return _FROZEN_INSTRUMENT_CONFIG
+        result = {}
+        for inst, defaults in INSTRUMENT_CONFIG.items():
+            result[inst] = {
+                "dollars_per_point": float(config.get(f"inst_{inst}_dpp", defaults["dollars_per_point"])),
+                "dollars_per_tick":  float(config.get(f"inst_{inst}_dpt", defaults["dollars_per_tick"])),
+                "ticks_per_point":   int(config.get(f"inst_{inst}_tpp",  defaults["ticks_per_point"])),
+            }
+        return result
+    return _cached_config("instrument_config", build)
 
 
 # Default risk-stop distance (points) for the per-tranche risk capture.
@@ -700,32 +903,30 @@ def compute_live_trade_plan(direction, instrument, entry_price, total_qty, mode)
     else:
         # Partials — divide into 3
         stop_dist = float(defaults["partial_stop_points"])
-        tp1_dist  = float(defaults["partial_tp1_points"])
-        tp2_dist  = float(defaults["partial_tp2_points"])
-        tp3_dist  = float(defaults["partial_tp3_points"])
+        tp_dists  = (float(defaults["partial_tp1_points"]),
+                     float(defaults["partial_tp2_points"]),
+                     float(defaults["partial_tp3_points"]))
 
-        # Divide qty as evenly as possible
-        base_qty = total_qty // 3
+        # Divide qty as evenly as possible, remainder to the first portions
+        base_qty  = total_qty // 3
         remainder = total_qty % 3
-        qtys = [base_qty, base_qty, base_qty]
-        # Distribute remainder to first portions
-        for i in range(remainder):
-            qtys[i] += 1
-
-        tp_dists = [tp1_dist, tp2_dist, tp3_dist]
+        qtys = [base_qty + 1 if i < remainder else base_qty for i in range(3)]
 
-        for i in range(3):
-            stop_price = entry_price - stop_dist if is_long else entry_price + stop_dist
-            risk = abs(entry_price - stop_price) * qtys[i] * dpp
+        # The stop is shared by all three portions and the per-contract
+        # risk/reward is just distance × $/point — compute each once.
+        stop_price = round(entry_price - stop_dist if is_long else entry_price + stop_dist, 2)
+        risk_per_contract = stop_dist * dpp
 
-            levels.append({"level_type": "stop", "portion": i + 1, "qty": qtys[i],
-                            "price": round(stop_price, 2), "risk_dollars": round(risk, 2), "reward_dollars": 0})
+        for i, (qty, tp_dist) in enumerate(zip(qtys, tp_dists)):
+            levels.append({"level_type": "stop", "portion": i + 1, "qty": qty,
+                            "price": stop_price,
+                            "risk_dollars": round(risk_per_contract * qty, 2), "reward_dollars": 0})
 
-            tp_price = entry_price + tp_dists[i] if is_long else entry_price - tp_dists[i]
-            reward = abs(tp_price - entry_price) * qtys[i] * dpp
+            tp_price = entry_price + tp_dist if is_long else entry_price - tp_dist
 
-            levels.append({"level_type": "tp", "portion": i + 1, "qty": qtys[i],
-                            "price": round(tp_price, 2), "risk_dollars": 0, "reward_dollars": round(reward, 2)})
+            levels.append({"level_type": "tp", "portion": i + 1, "qty": qty,
+                            "price": round(tp_price, 2), "risk_dollars": 0,
+                            "reward_dollars": round(tp_dist * dpp * qty, 2)})
 
     return levels
 
@@ -734,10 +935,28 @@ def compute_execution_pnl(direction, instrument, entry_price, exec_price, qty):
     """Calculate P&L for a single execution."""
     inst = get_instrument_config().get(instrument, INSTRUMENT_CONFIG["MES"])
     dpp = inst["dollars_per_point"]
-    if direction == "Long":
-        return round((exec_price - entry_price) * qty * dpp, 2)
-    else:
-        return round((entry_price - exec_price) * qty * dpp, 2)
+    sign = 1 if direction == "Long" else -1
+    return round(sign * (exec_price - entry_price) * qty * dpp, 2)
+
+
+def _aggregate_executions(executions):
+    """One pass over an executions list.
+
+    Returns (exited_qty, realized_pnl, exit_value, portion_exited) so
+    callers pick the fields they need instead of re-walking the list with
+    separate sum() expressions.
+    """
+    exited_qty   = 0
+    realized_pnl = 0.0
+    exit_value   = 0.0
+    portion_exited = {1: 0, 2: 0, 3: 0}
+    for e in executions:
+        qty = e["qty"]
+        exited_qty   += qty
+        realized_pnl += e["pnl"]
+        exit_value   += e["price"] * qty
+        portion_exited[e["portion"]] = portion_exited.get(e["portion"], 0) + qty
+    return exited_qty, realized_pnl, exit_value, portion_exited
 
 
 def recalculate_live_trade(live_trade):
@@ -762,18 +981,26 @@ def recalculate_live_trade(live_trade):
     inst = get_instrument_config().get(instrument, INSTRUMENT_CONFIG["MES"])
     dpp = inst["dollars_per_point"]
     is_long = direction == "Long"
+    sign = 1 if is_long else -1  # folds the Long/Short price-move branches
 
-    # Realized P&L and qty from executions
-    exited_qty = sum(e["qty"] for e in executions)
-    realized_pnl = sum(e["pnl"] for e in executions)
+    # Single pass over executions: realized P&L, exited qty, per-portion exits
+    exited_qty, realized_pnl, _, portion_exited = _aggregate_executions(executions)
     remaining_qty = total_qty - exited_qty
 
-    # Initial risk (what it was at entry, for reference)
+    # Single pass over levels: (type, portion) lookup, initial risk, and the
+    # first stop/tp (full mode has only one of each)
+    lv_by_key = {}
+    first_stop = first_tp = None
     initial_risk = 0
     for lv in levels:
-        if lv["level_type"] == "stop":
-            dist = abs(entry_price - lv["price"]) * lv["qty"] * dpp
-            initial_risk += dist
+        level_type = lv["level_type"]
+        lv_by_key[(level_type, lv["portion"])] = lv
+        if level_type == "stop":
+            initial_risk += abs(entry_price - lv["price"]) * lv["qty"] * dpp
+            if first_stop is None:
+                first_stop = lv
+        elif level_type == "tp" and first_tp is None:
+            first_tp = lv
 
     if remaining_qty <= 0:
         return {
@@ -792,23 +1019,12 @@ def recalculate_live_trade(live_trade):
     portion_details = []  # detailed per-portion breakdown
 
     if mode == "partials":
-        # Track how much has been exited per portion
-        portion_exited = {1: 0, 2: 0, 3: 0}
-        for e in executions:
-            portion_exited[e["portion"]] = portion_exited.get(e["portion"], 0) + e["qty"]
-
-        # Build lookup for levels
-        portion_levels = {}
-        for lv in levels:
-            key = (lv["level_type"], lv["portion"])
-            portion_levels[key] = lv
-
         total_stop_risk = 0  # raw risk from stops (can be negative = locked profit)
         total_reward = 0
 
         for p in [1, 2, 3]:
-            stop_lv = portion_levels.get(("stop", p))
-            tp_lv   = portion_levels.get(("tp", p))
+            stop_lv = lv_by_key.get(("stop", p))
+            tp_lv   = lv_by_key.get(("tp", p))
             if not stop_lv:
                 continue
 
@@ -821,10 +1037,7 @@ def recalculate_live_trade(live_trade):
             # Calculate stop outcome: what happens if stopped out
             # For Long: stop below entry = loss, stop above entry = locked profit
             # For Short: stop above entry = loss, stop below entry = locked profit
-            if is_long:
-                stop_pnl = (stop_lv["price"] - entry_price) * rem * dpp
-            else:
-                stop_pnl = (entry_price - stop_lv["price"]) * rem * dpp
+            stop_pnl = sign * (stop_lv["price"] - entry_price) * rem * dpp
 
             # stop_pnl < 0 means risk (loss if stopped)
             # stop_pnl > 0 means locked profit (trailing stop past entry)
@@ -832,10 +1045,7 @@ def recalculate_live_trade(live_trade):
 
             # Reward from TP
             if tp_lv:
-                if is_long:
-                    tp_pnl = (tp_lv["price"] - entry_price) * rem * dpp
-                else:
-                    tp_pnl = (entry_price - tp_lv["price"]) * rem * dpp
+                tp_pnl = sign * (tp_lv["price"] - entry_price) * rem * dpp
                 total_reward += max(tp_pnl, 0)
             else:
                 tp_pnl = 0
@@ -858,7 +1068,7 @@ def recalculate_live_trade(live_trade):
         else:
             current_risk = 0  # we're in profit even if stopped everywhere
 
-        net_stop_exposure = round(worst_case_pnl, 2)
+        net_stop_exposure = worst_case_pnl
 
     else:
         # Full mode
@@ -866,29 +1076,23 @@ def recalculate_live_trade(live_trade):
         net_stop_exposure = 0
 
         if remaining_qty > 0:
-            stop_lv = next((lv for lv in levels if lv["level_type"] == "stop"), None)
-            tp_lv   = next((lv for lv in levels if lv["level_type"] == "tp"), None)
+            stop_lv = first_stop
+            tp_lv   = first_tp
 
             if stop_lv:
-                if is_long:
-                    stop_pnl = (stop_lv["price"] - entry_price) * remaining_qty * dpp
-                else:
-                    stop_pnl = (entry_price - stop_lv["price"]) * remaining_qty * dpp
+                stop_pnl = sign * (stop_lv["price"] - entry_price) * remaining_qty * dpp
 
                 worst_case = stop_pnl + realized_pnl
                 if worst_case < 0:
                     current_risk = abs(worst_case)
                 else:
                     current_risk = 0
-                net_stop_exposure = round(worst_case, 2)
+                net_stop_exposure = worst_case
             else:
                 current_risk = 0
 
             if tp_lv:
-                if is_long:
-                    tp_pnl = (tp_lv["price"] - entry_price) * remaining_qty * dpp
-                else:
-                    tp_pnl = (entry_price - tp_lv["price"]) * remaining_qty * dpp
+                tp_pnl = sign * (tp_lv["price"] - entry_price) * remaining_qty * dpp
                 total_reward = max(tp_pnl, 0)
 
         portion_details = []
@@ -900,7 +1104,7 @@ def recalculate_live_trade(live_trade):
         "current_risk":     round(current_risk, 2),
         "potential_reward":  round(total_reward, 2),
         "initial_risk":     round(initial_risk, 2),
-        "net_stop_exposure": net_stop_exposure,  # negative = net loss if all stopped, positive = net profit even if stopped
+        "net_stop_exposure": round(net_stop_exposure, 2),  # negative = net loss if all stopped, positive = net profit even if stopped
         "active_portions":  [p for p in portion_details if p["qty"] > 0] if mode == "partials" else [],
         "portion_details":  portion_details,
         "is_closed":        remaining_qty <= 0,
@@ -986,14 +1190,12 @@ def close_live_trade_to_journal(live_trade_id):
     Called by user clicking "Save & Push to Journal".
     Trade does NOT need to be fully closed — user decides when to push.
     """
-    import json
-    from datetime import date as dt_date
-
     lt = db.get_live_trade(live_trade_id)
     if not lt:
         return None
 
     calc = recalculate_live_trade(lt)
+    today_iso = dt_date.today().isoformat()
 
     # Use the trade's creation date (not today) so trades land on the correct day
     # created_at is stored as UTC; convert to local date via SQLite
@@ -1003,25 +1205,13 @@ def close_live_trade_to_journal(live_trade_id):
             row = conn.execute(
                 "SELECT date(?, 'localtime')", (created_at,)
             ).fetchone()
-            trade_date = row[0] if row and row[0] else dt_date.today().isoformat()
+            trade_date = row[0] if row and row[0] else today_iso
     else:
-        trade_date = dt_date.today().isoformat()
+        trade_date = today_iso
     account_id = lt.get("account_id")
 
-    # Find or create trading day
-    existing_day = db.get_day_by_date_account(trade_date, account_id)
-    if existing_day:
-        day_id = existing_day["id"]
-    else:
-        day_id = db.upsert_day(trade_date, account_id)
-
-    # Determine next trade_num for this day
-    with db.get_conn() as conn:
-        max_num = conn.execute(
-            "SELECT COALESCE(MAX(trade_num), 0) FROM trades WHERE day_id = ?", (day_id,)
-        ).fetchone()[0]
-
-    trade_num = max_num + 1
+    # Find or create trading day (single statement, insert or existing id)
+    day_id = db.upsert_day_returning(trade_date, account_id)
 
     # POC dynamic-trade-model: split executions into entry-side (OPEN/ADD) vs exit-side
     executions = lt.get("executions", [])
@@ -1029,8 +1219,7 @@ def close_live_trade_to_journal(live_trade_id):
     exit_side_execs = [e for e in executions if str(e.get("exec_type") or "").upper() not in ("OPEN", "ADD")]
 
     # Avg exit from exit-side executions only
-    total_exit_val = sum(e["price"] * e["qty"] for e in exit_side_execs)
-    total_exit_qty = sum(e["qty"] for e in exit_side_execs)
+    total_exit_qty, _, total_exit_val, _ = _aggregate_executions(exit_side_execs)
     avg_exit = round(total_exit_val / total_exit_qty, 4) if total_exit_qty else lt["entry_price"]
 
     # Get last exit execution time (fall back to entry_time if never exited)
@@ -1059,7 +1248,7 @@ def close_live_trade_to_journal(live_trade_id):
     execution_json_str = json.dumps(exec_detail)
 
     trade_id = db.insert_trade(
-        day_id, trade_num, lt["direction"], lt["total_qty"],
+        day_id, None, lt["direction"], lt["total_qty"],  # trade_num assigned in-SQL
         avg_entry_for_journal, avg_exit, realized_pnl,
         lt["entry_time"], exit_time, is_open=(calc["remaining_qty"] > 0),
         execution_json=execution_json_str,
@@ -1067,11 +1256,11 @@ def close_live_trade_to_journal(live_trade_id):
         context_id=lt.get("context_id")
     )
 
-    # Save tags from live trade
+    # Save tags from live trade (all groups in one DB call)
     try:
         tags = json.loads(lt.get("tags_json", "{}"))
-        for group_id, tag_list in tags.items():
-            db.set_trade_tags(trade_id, group_id, tag_list)
+        if tags:
+            db.set_trade_tags_bulk(trade_id, tags)
     except (json.JSONDecodeError, AttributeError):
         pass
 
@@ -1090,11 +1279,11 @@ def close_live_trade_to_journal(live_trade_id):
     entry_side = "Buy" if lt["direction"] == "Long" else "Sell"
     exit_side = "Sell" if lt["direction"] == "Long" else "Buy"
 
+    fill_rows = []  # (fill_time, side, qty, price, exit_type, stop_price, stop_source)
     if entry_side_execs:
         for e in entry_side_execs:
-            db.insert_fill(trade_id, e["exec_time"], entry_side, e["qty"], e["price"], exit_type=None,
-                           stop_price=e.get("stop_price"),
-                           stop_source=e.get("stop_source") or "default")
+            fill_rows.append((e["exec_time"], entry_side, e["qty"], e["price"], None,
+                              e.get("stop_price"), e.get("stop_source") or "default"))
     else:
         # Legacy path (no OPEN execution row): synthesise an entry fill. Carry the
         # live trade's initial working stop if one exists, else a 20-pt default.
@@ -1105,12 +1294,14 @@ def close_live_trade_to_journal(live_trade_id):
         else:
             legacy_stop = compute_default_risk_stop(lt["direction"], lt["entry_price"])
             legacy_source = "default"
-        db.insert_fill(trade_id, lt["entry_time"], entry_side, lt["total_qty"], lt["entry_price"],
-                       exit_type=None, stop_price=legacy_stop, stop_source=legacy_source)
+        fill_rows.append((lt["entry_time"], entry_side, lt["total_qty"], lt["entry_price"],
+                          None, legacy_stop, legacy_source))
 
     for e in exit_side_execs:
-        db.insert_fill(trade_id, e["exec_time"], exit_side, e["qty"], e["price"],
-                       exit_type=e.get("exec_type"), stop_price=None, stop_source='default')
+        fill_rows.append((e["exec_time"], exit_side, e["qty"], e["price"],
+                          e.get("exec_type"), None, "default"))
+
+    db.insert_fills_bulk(trade_id, fill_rows)
 
     # Copy live trade images to journal trade
     live_images = db.get_live_trade_images(live_trade_id)
@@ -1120,7 +1311,7 @@ def close_live_trade_to_journal(live_trade_id):
     # Mark live trade as closed and link to journal
     db.update_live_trade(live_trade_id,
                          status="closed",
-                         closed_at=dt_date.today().isoformat(),
+                         closed_at=today_iso,
                          realized_pnl=realized_pnl,
                          journal_trade_id=trade_id)
 
@@ -3,27 +3,172 @@ DATABASE LAYER
 All SQLite interactions. No business logic, no HTTP concerns.
 """
 
+import atexit
 import sqlite3
 import os
 import json
+import threading
+import time
+from collections import defaultdict, deque
 from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "journal.db")
 
+# One cached connection per thread. Opening a connection used to happen on
+# every helper call, paying connect + PRAGMA handshake each time; reusing it
+# drops that to pure statement execution. The generation counter lets
+# reset_connections() invalidate every thread's handle when the DB file is
+# replaced wholesale (restore-from-backup).
+_tls = threading.local()
+_db_generation = 0
+
+
+def _thread_conn():
+    conn = getattr(_tls, "conn", None)
+    if (conn is None
+            or getattr(_tls, "path", None) != DB_PATH
+            or getattr(_tls, "generation", None) != _db_generation):
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        # Issued once per connection (not per call). synchronous=NORMAL is
+        # safe under WAL and skips the fsync on every commit; the bigger
+        # page cache, in-memory temp store, and mmap mainly help the
+        # analytics GROUP BYs; busy_timeout covers writer contention
+        # between threads.
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=5000;
+            PRAGMA foreign_keys=ON;
+        """)
+        _tls.conn = conn
+        _tls.path = DB_PATH
+        _tls.generation = _db_generation
+    return conn
+
+
+def _thread_read_conn():
+    """Thread-local read-only connection (mode=ro URI).
+
+    SQLite allows many concurrent readers under WAL but only one writer;
+    keeping the read side on separate handles means list/analytics
+    queries never queue behind a write transaction's lock. Falls back to
+    the read-write connection if the read-only open fails (fresh DB file
+    whose WAL sidecars don't exist yet).
+    """
+    conn = getattr(_tls, "rconn", None)
+    if (conn is None
+            or getattr(_tls, "rpath", None) != DB_PATH
+            or getattr(_tls, "rgeneration", None) != _db_generation):
+        if conn is not None:
+            conn.close()
+        try:
+            conn = sqlite3.connect("file:" + DB_PATH + "?mode=ro", uri=True)
+        except sqlite3.OperationalError:
+            return _thread_conn()
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA query_only=ON;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=5000;
+        """)
+        _tls.rconn = conn
+        _tls.rpath = DB_PATH
+        _tls.rgeneration = _db_generation
+    return conn
+
+
+def reset_connections():
+    """Invalidate all cached connections (call after replacing the DB file).
+
+    The calling thread's connections close immediately; other threads
+    reopen lazily on their next get_conn()/get_read_conn().
+    """
+    global _db_generation
+    _db_generation += 1
+    # Read-only handle first: it cannot checkpoint, so closing it last
+    # would leave a hot -wal sidecar behind. Then checkpoint through the
+    # read-write handle before closing it, so the main DB file is complete
+    # and a caller may swap it without a stale WAL replaying over the
+    # replacement.
+    rconn = getattr(_tls, "rconn", None)
+    if rconn is not None:
+        rconn.close()
+        _tls.rconn = None
+    conn = getattr(_tls, "conn", None)
+    if conn is not None:
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+        conn.close()
+        _tls.conn = None
+    # A replaced DB file may carry different config tables.
+    _invalidate_config_caches()
+
+
+atexit.register(reset_connections)
+
+# Serializes write transactions in-process so concurrent request threads
+# queue on a Python lock instead of spinning on SQLITE_BUSY. Re-entrant so
+# a writer helper may call another on the same thread.
+_write_lock = threading.RLock()
+
+# PRAGMA optimize refreshes planner statistics for whichever indexes recent
+# queries actually used; it is cheap, but there is no point running it more
+# than every so often.
+_OPTIMIZE_INTERVAL_SECS = 15 * 60
+_last_optimize_ts = 0.0
+
+
+def _maybe_optimize(conn):
+    global _last_optimize_ts
+    now = time.time()
+    if now - _last_optimize_ts >= _OPTIMIZE_INTERVAL_SECS:
+        _last_optimize_ts = now
+        conn.execute("PRAGMA optimize")
+
+
+def _optimize_at_exit():
+    conn = getattr(_tls, "conn", None)
+    if conn is not None:
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+
+
+# Registered after reset_connections so it runs first (atexit is LIFO) —
+# the connection must still be open for the final optimize pass.
+atexit.register(_optimize_at_exit)
+
+
 @contextmanager
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    """Read-write connection; one write transaction at a time per process."""
+    with _write_lock:
+        conn = _thread_conn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        _maybe_optimize(conn)
+
+
+@contextmanager
+def get_read_conn():
+    """Read-only connection for SELECT-only helpers; never takes the write lock."""
+    yield _thread_read_conn()
 
 
 def _migrate_portfolio_to_account(conn):
@@ -143,6 +288,17 @@ def _migrate_obs_category_to_json(conn):
 def init_db():
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     with get_conn() as conn:
+        # 8 KiB pages pack more rows per B-tree node, so scans (analytics
+        # GROUP BYs especially) touch fewer pages. page_size only takes
+        # effect after a VACUUM, and not while in WAL mode, so the one-time
+        # rewrite toggles journal modes around it. Once converted the check
+        # is a single cheap PRAGMA.
+        if conn.execute("PRAGMA page_size").fetchone()[0] < 8192:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.execute("PRAGMA page_size=8192")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA journal_mode=WAL")
+
         # Run migration from portfolio → account if needed
         _migrate_portfolio_to_account(conn)
 
@@ -197,6 +353,19 @@ def init_db():
                 UNIQUE(trade_id, group_id, tag)
             );
 
+            -- Roll-up of per-day trade aggregates, refreshed in the same
+            -- transaction as any trade insert/delete. Lets the day list and
+            -- account list read point rows instead of re-aggregating trades.
+            CREATE TABLE IF NOT EXISTS day_stats (
+                day_id        INTEGER PRIMARY KEY REFERENCES trading_days(id) ON DELETE CASCADE,
+                trade_count   INTEGER NOT NULL DEFAULT 0,
+                total_pnl     REAL    NOT NULL DEFAULT 0,
+                wins          INTEGER NOT NULL DEFAULT 0,
+                best_pnl      REAL,
+                worst_pnl     REAL,
+                avg_hold_secs REAL
+            );
+
             CREATE INDEX IF NOT EXISTS idx_trades_day     ON trades(day_id);
             CREATE INDEX IF NOT EXISTS idx_fills_trade    ON fills(trade_id);
             CREATE INDEX IF NOT EXISTS idx_tags_trade     ON trade_tags(trade_id);
@@ -204,6 +373,13 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_days_date      ON trading_days(date);
             CREATE INDEX IF NOT EXISTS idx_days_account ON trading_days(account_id);
 
+            -- Composite indexes covering the analytics aggregations, so the
+            -- planner can stream rows in group order instead of scan + temp sort.
+            CREATE INDEX IF NOT EXISTS idx_trades_day_entry     ON trades(day_id, entry_time);
+            CREATE INDEX IF NOT EXISTS idx_trades_day_pnl       ON trades(day_id, pnl);
+            CREATE INDEX IF NOT EXISTS idx_tags_group_tag_trade ON trade_tags(group_id, tag, trade_id);
+            CREATE INDEX IF NOT EXISTS idx_days_date_account    ON trading_days(date, account_id);
+
             CREATE TABLE IF NOT EXISTS tag_config (
                 id        INTEGER PRIMARY KEY AUTOINCREMENT,
                 group_id  TEXT    NOT NULL,
@@ -285,6 +461,8 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_live_images ON live_trade_images(live_trade_id);
             CREATE INDEX IF NOT EXISTS idx_live_levels ON live_trade_levels(live_trade_id);
             CREATE INDEX IF NOT EXISTS idx_live_execs  ON live_trade_executions(live_trade_id);
+            CREATE INDEX IF NOT EXISTS idx_live_created ON live_trades(created_at);
+            CREATE INDEX IF NOT EXISTS idx_live_status_created ON live_trades(status, created_at DESC);
         """)
         # Safe migration for existing databases
         cols = [r[1] for r in conn.execute("PRAGMA table_info(trading_days)").fetchall()]
@@ -714,6 +892,21 @@ def init_db():
         # Migration: merge phantom NULL-account days into their real account day
         _migrate_merge_null_account_days(conn)
 
+        # Backfill day_stats roll-up rows for any day that has trades but no
+        # stats row yet (first run after the table was introduced, or a DB
+        # restored from a SQL dump that predates it). No-op once in sync.
+        conn.execute(f"""
+            INSERT INTO day_stats (day_id, trade_count, total_pnl, wins, best_pnl, worst_pnl, avg_hold_secs)
+            SELECT day_id, COUNT(*), SUM(pnl), SUM(pnl > 0), MAX(pnl), MIN(pnl), AVG({_HOLD_SECS_EXPR})
+            FROM trades
+            WHERE day_id NOT IN (SELECT day_id FROM day_stats)
+            GROUP BY day_id
+        """)
+
+        # Refresh planner statistics so the composite indexes actually get used.
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+
 
 def _migrate_merge_null_account_days(conn):
     """One-time, idempotent cleanup for the 'phantom NULL-account day' bug.
@@ -803,17 +996,17 @@ def _migrate_merge_null_account_days(conn):
 # ── Accounts ─────────────────────────────────────────────────────────────────
 
 def get_all_accounts():
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute("""
             SELECT a.id, a.name, a.description, a.color, a.created_at,
                    a.account_size, a.default_qty, a.default_instrument,
                    a.is_primary, a.risk_per_trade_pct,
-                   COUNT(DISTINCT d.id)  as day_count,
-                   COUNT(t.id)           as trade_count,
-                   ROUND(SUM(t.pnl), 2)  as total_pnl
+                   COUNT(d.id)                        as day_count,
+                   COALESCE(SUM(s.trade_count), 0)    as trade_count,
+                   ROUND(SUM(s.total_pnl), 2)         as total_pnl
             FROM accounts a
             LEFT JOIN trading_days d ON d.account_id = a.id
-            LEFT JOIN trades t       ON t.day_id = d.id
+            LEFT JOIN day_stats s    ON s.day_id = d.id
             GROUP BY a.id
             ORDER BY a.is_primary DESC, a.name
         """).fetchall()
@@ -821,7 +1014,7 @@ def get_all_accounts():
 
 
 def get_account_by_id(account_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT * FROM accounts WHERE id = ?", (account_id,)).fetchone()
         return dict(row) if row else None
 
@@ -871,7 +1064,7 @@ def delete_account(account_id):
 # ── Trading Days ──────────────────────────────────────────────────────────────
 
 def get_all_days(date_from=None, date_to=None, account_id=None):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         wheres, params = [], []
         if date_from:
             wheres.append("d.date >= ?"); params.append(date_from)
@@ -881,43 +1074,27 @@ def get_all_days(date_from=None, date_to=None, account_id=None):
             wheres.append("d.account_id = ?"); params.append(int(account_id))
         where_sql = ("WHERE " + " AND ".join(wheres)) if wheres else ""
 
+        # Per-day aggregates come from the day_stats roll-up (maintained at
+        # trade-write time) instead of re-aggregating the trades table here.
         rows = conn.execute(f"""
             SELECT d.id, d.date, d.imported_at, d.account_id, d.day_score,
                    a.name  as account_name,
                    a.color as account_color,
-                   COUNT(t.id)  as trade_count,
-                   ROUND(COALESCE(SUM(t.pnl), 0), 2) as total_pnl,
-                   SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) as wins,
-                   -- avg trade duration (seconds) for this day. Times are stored as
-                   -- 'HH:MM' (live-pushed) or 'HH:MM:SS' (imported); both have HH at
-                   -- pos 1-2 and MM at 4-5, with optional SS at 7-8. Rows that don't
-                   -- match either shape, or that go negative (cross-midnight artifacts),
-                   -- yield NULL and are ignored by AVG.
-                   AVG(
-                     CASE WHEN length(t.entry_time) IN (5,8) AND length(t.exit_time) IN (5,8)
-                               AND substr(t.entry_time,3,1) = ':' AND substr(t.exit_time,3,1) = ':'
-                          THEN NULLIF(MAX(-1,
-                              (CAST(substr(t.exit_time,1,2) AS INTEGER)*3600
-                             + CAST(substr(t.exit_time,4,2) AS INTEGER)*60
-                             + CASE WHEN length(t.exit_time)=8 THEN CAST(substr(t.exit_time,7,2) AS INTEGER) ELSE 0 END)
-                            - (CAST(substr(t.entry_time,1,2) AS INTEGER)*3600
-                             + CAST(substr(t.entry_time,4,2) AS INTEGER)*60
-                             + CASE WHEN length(t.entry_time)=8 THEN CAST(substr(t.entry_time,7,2) AS INTEGER) ELSE 0 END)
-                          ), -1)
-                     END
-                   ) as avg_hold_secs
+                   COALESCE(s.trade_count, 0)         as trade_count,
+                   ROUND(COALESCE(s.total_pnl, 0), 2) as total_pnl,
+                   s.wins                             as wins,
+                   s.avg_hold_secs                    as avg_hold_secs
             FROM trading_days d
-            LEFT JOIN accounts a ON a.id = d.account_id
-            LEFT JOIN trades t     ON t.day_id = d.id
+            LEFT JOIN accounts a  ON a.id = d.account_id
+            LEFT JOIN day_stats s ON s.day_id = d.id
             {where_sql}
-            GROUP BY d.id
             ORDER BY d.date DESC
         """, params).fetchall()
         return [dict(r) for r in rows]
 
 
 def get_day_by_id(day_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("""
             SELECT d.*, a.name as account_name, a.color as account_color
             FROM trading_days d
@@ -929,7 +1106,7 @@ def get_day_by_id(day_id):
 
 def get_day_by_date(date_str):
     """Backwards-compat: first matching day for a date."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("""
             SELECT d.*, a.name as account_name, a.color as account_color
             FROM trading_days d
@@ -941,43 +1118,49 @@ def get_day_by_date(date_str):
 
 
 def get_day_by_date_account(date_str, account_id):
-    with get_conn() as conn:
-        if account_id:
-            row = conn.execute(
-                "SELECT * FROM trading_days WHERE date = ? AND account_id = ?",
-                (date_str, int(account_id))
-            ).fetchone()
-        else:
-            row = conn.execute(
-                "SELECT * FROM trading_days WHERE date = ? AND account_id IS NULL",
-                (date_str,)
-            ).fetchone()
+    with get_read_conn() as conn:
+        # IS matches both NULL and concrete ids, so one statement covers
+        # both paths (and stays hot in the statement cache).
+        row = conn.execute(
+            "SELECT * FROM trading_days WHERE date = ? AND account_id IS ?",
+            (date_str, int(account_id) if account_id else None)
+        ).fetchone()
         return dict(row) if row else None
 
 
 def upsert_day(date_str, account_id=None):
     with get_conn() as conn:
         if account_id:
-            conn.execute(
-                "INSERT OR IGNORE INTO trading_days (date, account_id) VALUES (?, ?)",
-                (date_str, int(account_id))
-            )
+            # One statement instead of insert-then-select: the no-op
+            # DO UPDATE makes RETURNING fire on conflict too.
             row = conn.execute(
-                "SELECT id FROM trading_days WHERE date = ? AND account_id = ?",
+                """INSERT INTO trading_days (date, account_id) VALUES (?, ?)
+                   ON CONFLICT(date, account_id) DO UPDATE SET date = date
+                   RETURNING id""",
                 (date_str, int(account_id))
             ).fetchone()
         else:
-            conn.execute(
-                "INSERT OR IGNORE INTO trading_days (date, account_id) VALUES (?, NULL)",
-                (date_str,)
-            )
+            # NULLs are distinct under UNIQUE(date, account_id), so OR IGNORE
+            # can never dedupe this path (each call used to add a phantom
+            # row); probe first and insert only when missing.
             row = conn.execute(
                 "SELECT id FROM trading_days WHERE date = ? AND account_id IS NULL",
                 (date_str,)
             ).fetchone()
+            if row is None:
+                row = conn.execute(
+                    "INSERT INTO trading_days (date, account_id) VALUES (?, NULL) RETURNING id",
+                    (date_str,)
+                ).fetchone()
         return row["id"]
 
 
+def upsert_day_returning(date_str, account_id=None):
+    """Kept for callers that adopted it before upsert_day itself went
+    single-statement; the two are now equivalent."""
+    return upsert_day(date_str, account_id)
+
+
 def delete_day(day_id):
     with get_conn() as conn:
         # Delete live_trades linked to this day's journal trades (cascade deletes levels/executions)
@@ -995,12 +1178,71 @@ def delete_day(day_id):
 
 # ── Trades ────────────────────────────────────────────────────────────────────
 
+# Avg trade duration (seconds). Times are stored as 'HH:MM' (live-pushed) or
+# 'HH:MM:SS' (imported); both have HH at pos 1-2 and MM at 4-5, with optional
+# SS at 7-8. Rows that don't match either shape, or that go negative
+# (cross-midnight artifacts), yield NULL and are ignored by AVG.
+_HOLD_SECS_EXPR = """
+    CASE WHEN length(entry_time) IN (5,8) AND length(exit_time) IN (5,8)
+              AND substr(entry_time,3,1) = ':' AND substr(exit_time,3,1) = ':'
+         THEN NULLIF(MAX(-1,
+             (CAST(substr(exit_time,1,2) AS INTEGER)*3600
+            + CAST(substr(exit_time,4,2) AS INTEGER)*60
+            + CASE WHEN length(exit_time)=8 THEN CAST(substr(exit_time,7,2) AS INTEGER) ELSE 0 END)
+           - (CAST(substr(entry_time,1,2) AS INTEGER)*3600
+            + CAST(substr(entry_time,4,2) AS INTEGER)*60
+            + CASE WHEN length(entry_time)=8 THEN CAST(substr(entry_time,7,2) AS INTEGER) ELSE 0 END)
+         ), -1)
+    END
+"""
+
+
+def _refresh_day_stats(conn, day_id):
+    """Recompute the day_stats roll-up row for one day.
+
+    Runs in the same transaction as the trade write that invalidated it,
+    so readers never observe a stale row.
+    """
+    conn.execute("DELETE FROM day_stats WHERE day_id = ?", (day_id,))
+    conn.execute(f"""
+        INSERT INTO day_stats (day_id, trade_count, total_pnl, wins, best_pnl, worst_pnl, avg_hold_secs)
+        SELECT day_id, COUNT(*), SUM(pnl), SUM(pnl > 0), MAX(pnl), MIN(pnl), AVG({_HOLD_SECS_EXPR})
+        FROM trades WHERE day_id = ? GROUP BY day_id
+    """, (day_id,))
+
+
 def get_trades_for_day(day_id):
     import json as _json
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         trades = conn.execute(
             "SELECT * FROM trades WHERE day_id = ? ORDER BY trade_num", (day_id,)
         ).fetchall()
+        if not trades:
+            return []
+
+        # Fetch all children in one query per table instead of 3 per trade,
+        # then bucket them by trade_id in Python.
+        ids = [t["id"] for t in trades]
+        placeholders = ",".join("?" * len(ids))
+
+        fills_by_trade = defaultdict(list)
+        for f in conn.execute(
+            f"SELECT * FROM fills WHERE trade_id IN ({placeholders}) ORDER BY trade_id, fill_time", ids
+        ):
+            fills_by_trade[f["trade_id"]].append(dict(f))
+
+        tags_by_trade = defaultdict(dict)
+        for tag_row in conn.execute(
+            f"SELECT trade_id, group_id, tag FROM trade_tags WHERE trade_id IN ({placeholders})", ids
+        ):
+            tags_by_trade[tag_row["trade_id"]].setdefault(tag_row["group_id"], []).append(tag_row["tag"])
+
+        images_by_trade = defaultdict(list)
+        for img in conn.execute(
+            f"SELECT * FROM trade_images WHERE trade_id IN ({placeholders}) ORDER BY trade_id, uploaded_at", ids
+        ):
+            images_by_trade[img["trade_id"]].append(dict(img))
+
         result = []
         for t in trades:
             td = dict(t)
@@ -1012,58 +1254,71 @@ def get_trades_for_day(day_id):
                     td["exec_score"] = _json.loads(es_raw).get("score")
                 except (ValueError, TypeError, AttributeError):
                     pass
-            td["fills"] = [dict(f) for f in conn.execute(
-                "SELECT * FROM fills WHERE trade_id = ? ORDER BY fill_time", (t["id"],)
-            ).fetchall()]
-            td["tags"] = {}
-            for tag_row in conn.execute(
-                "SELECT group_id, tag FROM trade_tags WHERE trade_id = ?", (t["id"],)
-            ).fetchall():
-                td["tags"].setdefault(tag_row["group_id"], []).append(tag_row["tag"])
-            td["images"] = [dict(r) for r in conn.execute(
-                "SELECT * FROM trade_images WHERE trade_id = ? ORDER BY uploaded_at", (t["id"],)
-            ).fetchall()]
+            td["fills"]  = fills_by_trade.get(td["id"], [])
+            td["tags"]   = tags_by_trade.get(td["id"], {})
+            td["images"] = images_by_trade.get(td["id"], [])
             result.append(td)
         return result
 
 
 def get_trade_by_id(trade_id):
-    with get_conn() as conn:
-        t = conn.execute("SELECT * FROM trades WHERE id = ?", (trade_id,)).fetchone()
+    # One statement instead of five: the child tables come back as
+    # JSON-aggregated blobs (fills/tags/images) alongside the trade and
+    # its day/account columns, and get decoded in Python.
+    with get_read_conn() as conn:
+        t = conn.execute("""
+            SELECT t.*,
+                   d.date, d.account_id,
+                   a.name  as account_name,
+                   a.color as account_color,
+                   (SELECT json_group_array(json_object(
+                        'id', id, 'trade_id', trade_id, 'fill_time', fill_time,
+                        'side', side, 'qty', qty, 'price', price,
+                        'exit_type', exit_type, 'stop_price', stop_price,
+                        'stop_source', stop_source))
+                    FROM (SELECT * FROM fills WHERE trade_id = t.id ORDER BY fill_time)
+                   ) as fills_json,
+                   (SELECT json_group_object(group_id, json(tag_list))
+                    FROM (SELECT group_id, json_group_array(tag) as tag_list
+                          FROM trade_tags WHERE trade_id = t.id GROUP BY group_id)
+                   ) as tags_json,
+                   (SELECT json_group_array(json_object(
+                        'id', id, 'trade_id', trade_id, 'filename', filename,
+                        'caption', caption, 'uploaded_at', uploaded_at))
+                    FROM (SELECT * FROM trade_images WHERE trade_id = t.id ORDER BY uploaded_at)
+                   ) as images_json
+            FROM trades t
+            LEFT JOIN trading_days d ON d.id = t.day_id
+            LEFT JOIN accounts a     ON a.id = d.account_id
+            WHERE t.id = ?
+        """, (trade_id,)).fetchone()
         if not t:
             return None
         td = dict(t)
-        td["fills"] = [dict(f) for f in conn.execute(
-            "SELECT * FROM fills WHERE trade_id = ? ORDER BY fill_time", (trade_id,)
-        ).fetchall()]
-        td["tags"] = {}
-        for tag_row in conn.execute(
-            "SELECT group_id, tag FROM trade_tags WHERE trade_id = ?", (trade_id,)
-        ).fetchall():
-            td["tags"].setdefault(tag_row["group_id"], []).append(tag_row["tag"])
-        day = conn.execute("""
-            SELECT d.date, d.account_id,
-                   a.name as account_name, a.color as account_color
-            FROM trading_days d
-            LEFT JOIN accounts a ON a.id = d.account_id
-            WHERE d.id = ?
-        """, (td["day_id"],)).fetchone()
-        if day:
-            td["date"]            = day["date"]
-            td["account_id"]      = day["account_id"]
-            td["account_name"]  = day["account_name"]
-            td["account_color"] = day["account_color"]
-        td["images"] = get_trade_images(trade_id)
+        td["fills"]  = json.loads(td.pop("fills_json") or "[]")
+        td["tags"]   = json.loads(td.pop("tags_json") or "{}")
+        td["images"] = json.loads(td.pop("images_json") or "[]")
         return td
 
 
 def insert_trade(day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, is_open=False, execution_json=None, execution_score_json=None, context_id=None):
     with get_conn() as conn:
-        cur = conn.execute("""
-            INSERT INTO trades
-                (day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, is_open, execution_json, execution_score_json, context_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, 1 if is_open else 0, execution_json, execution_score_json, context_id))
+        if trade_num is None:
+            # Assign the next number for the day in-SQL — no separate
+            # SELECT MAX round trip, and no race between reading the max
+            # and inserting.
+            cur = conn.execute("""
+                INSERT INTO trades
+                    (day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, is_open, execution_json, execution_score_json, context_id)
+                VALUES (?, COALESCE((SELECT MAX(trade_num) + 1 FROM trades WHERE day_id = ?), 1), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (day_id, day_id, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, 1 if is_open else 0, execution_json, execution_score_json, context_id))
+        else:
+            cur = conn.execute("""
+                INSERT INTO trades
+                    (day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, is_open, execution_json, execution_score_json, context_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, 1 if is_open else 0, execution_json, execution_score_json, context_id))
+        _refresh_day_stats(conn, day_id)
         return cur.lastrowid
 
 
@@ -1077,6 +1332,49 @@ def insert_fill(trade_id, fill_time, side, qty, price, exit_type=None,
         )
 
 
+def insert_day_trades_bulk(day_id, trades):
+    """Insert a full day's trades and their fills in one transaction.
+
+    The import path used to open a fresh connection per trade and per
+    fill; here one connection covers the whole day and the fills go in
+    via a single executemany. Each trade dict carries its fills under
+    "fills" (side/qty/price/time keys, as built by reconstruct_trades).
+    """
+    with get_conn() as conn:
+        fill_rows = []
+        for t in trades:
+            cur = conn.execute("""
+                INSERT INTO trades
+                    (day_id, trade_num, direction, qty, avg_entry, avg_exit, pnl, entry_time, exit_time, is_open)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (day_id, t["trade_num"], t["direction"], t["qty"],
+                  t["avg_entry"], t["avg_exit"], t["pnl"],
+                  t["entry_time"], t["exit_time"], 1 if t.get("open") else 0))
+            trade_id = cur.lastrowid
+            for f in t["fills"]:
+                fill_rows.append((trade_id, f["time"], f["side"], f["qty"], f["price"]))
+        if fill_rows:
+            conn.executemany(
+                "INSERT INTO fills (trade_id, fill_time, side, qty, price) VALUES (?, ?, ?, ?, ?)",
+                fill_rows
+            )
+        _refresh_day_stats(conn, day_id)
+
+
+def insert_fills_bulk(trade_id, fills):
+    """Insert several fills for one trade via a single executemany.
+
+    fills is a list of (fill_time, side, qty, price, exit_type,
+    stop_price, stop_source) tuples.
+    """
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO fills (trade_id, fill_time, side, qty, price, exit_type, stop_price, stop_source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(trade_id, *f) for f in fills]
+        )
+
+
 def update_trade_notes(trade_id, notes, notes_monitoring=None, notes_exit=None):
     with get_conn() as conn:
         sets = ["notes = ?"]
@@ -1097,10 +1395,28 @@ def set_trade_tags(trade_id, group_id, tags):
             "DELETE FROM trade_tags WHERE trade_id = ? AND group_id = ?",
             (trade_id, group_id)
         )
-        for tag in tags:
-            conn.execute(
+        conn.executemany(
+            "INSERT OR IGNORE INTO trade_tags (trade_id, group_id, tag) VALUES (?, ?, ?)",
+            [(trade_id, group_id, tag) for tag in tags]
+        )
+
+
+def set_trade_tags_bulk(trade_id, group_to_tags):
+    """Replace every tag group for a trade in one connection.
+
+    group_to_tags is {group_id: [tag, ...]}. One DELETE covers the whole
+    trade and all (group, tag) pairs go in via a single executemany,
+    instead of a connection per group.
+    """
+    with get_conn() as conn:
+        conn.execute("DELETE FROM trade_tags WHERE trade_id = ?", (trade_id,))
+        rows = [(trade_id, group_id, tag)
+                for group_id, tags in group_to_tags.items()
+                for tag in tags]
+        if rows:
+            conn.executemany(
                 "INSERT OR IGNORE INTO trade_tags (trade_id, group_id, tag) VALUES (?, ?, ?)",
-                (trade_id, group_id, tag)
+                rows
             )
 
 
@@ -1116,7 +1432,7 @@ def add_trade_image(trade_id, filename, caption=""):
 
 
 def get_trade_images(trade_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM trade_images WHERE trade_id = ? ORDER BY uploaded_at",
             (trade_id,)
@@ -1137,6 +1453,27 @@ def delete_trade_image(image_id):
         return filename
 
 
+_IMAGE_TABLES = (
+    "trade_images", "live_trade_images", "day_images",
+    "setup_images", "observation_images",
+)
+
+
+def image_filename_referenced(filename):
+    """True if any image row (of any kind) still points at this filename.
+
+    Image files are content-addressed, so identical uploads share one file
+    on disk; callers must not unlink it until the last reference is gone.
+    """
+    with get_read_conn() as conn:
+        for table in _IMAGE_TABLES:
+            if conn.execute(
+                f"SELECT 1 FROM {table} WHERE filename = ? LIMIT 1", (filename,)
+            ).fetchone():
+                return True
+    return False
+
+
 # ── Live Trade Images ────────────────────────────────────────────────────────
 
 def add_live_trade_image(live_trade_id, filename, caption=""):
@@ -1149,7 +1486,7 @@ def add_live_trade_image(live_trade_id, filename, caption=""):
 
 
 def get_live_trade_images(live_trade_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM live_trade_images WHERE live_trade_id = ? ORDER BY uploaded_at",
             (live_trade_id,)
@@ -1167,17 +1504,40 @@ def delete_live_trade_image(image_id):
 
 # ── Tag Configuration ─────────────────────────────────────────────────────────
 
+# get_tag_config / get_all_config run on nearly every page render but their
+# tables only change through the writers below, so both are memoized in
+# process. A "loaded" flag (rather than a None sentinel) is needed for the
+# tag config because None is a legitimate result (no custom config).
+_tag_config_cache = None
+_tag_config_loaded = False
+_all_config_cache = None
+_config_cache_lock = threading.Lock()
+
+
+def _invalidate_config_caches():
+    global _tag_config_loaded, _all_config_cache
+    with _config_cache_lock:
+        _tag_config_loaded = False
+        _all_config_cache = None
+
+
 def get_tag_config():
     """Return {group_id: [tag, ...]} for enabled tags in order. None if no custom config."""
-    with get_conn() as conn:
+    global _tag_config_cache, _tag_config_loaded
+    if _tag_config_loaded:
+        return _tag_config_cache
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT group_id, tag FROM tag_config WHERE enabled=1 ORDER BY group_id, position"
         ).fetchall()
-        if not rows:
-            return None
-        result = {}
-        for r in rows:
-            result.setdefault(r["group_id"], []).append(r["tag"])
+        result = None
+        if rows:
+            result = {}
+            for r in rows:
+                result.setdefault(r["group_id"], []).append(r["tag"])
+        with _config_cache_lock:
+            _tag_config_cache = result
+            _tag_config_loaded = True
         return result
 
 
@@ -1373,17 +1733,18 @@ def save_tag_config(group_id, tags):
 
         # 4. Replace tag_config (existing logic)
         conn.execute("DELETE FROM tag_config WHERE group_id = ?", (group_id,))
-        for i, tag in enumerate(new_tags):
-            conn.execute(
-                "INSERT OR REPLACE INTO tag_config (group_id, tag, position, enabled) VALUES (?, ?, ?, 1)",
-                (group_id, tag, i)
-            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO tag_config (group_id, tag, position, enabled) VALUES (?, ?, ?, 1)",
+            [(group_id, tag, i) for i, tag in enumerate(new_tags)]
+        )
+    _invalidate_config_caches()
 
 
 def reset_tag_config(group_id):
     """Delete custom config for a group so it falls back to app_logic defaults."""
     with get_conn() as conn:
         conn.execute("DELETE FROM tag_config WHERE group_id = ?", (group_id,))
+    _invalidate_config_caches()
 
 
 # ── Analytics ─────────────────────────────────────────────────────────────────
@@ -1394,107 +1755,101 @@ def _compute_streaks(trades):
         return {"current": 0, "current_type": None,
                 "best_win": 0, "worst_loss": 0, "history": []}
 
-    results = ["W" if t["pnl"] > 0 else ("L" if t["pnl"] < 0 else "B") for t in trades]
-
-    cur_type  = results[-1]
-    cur_count = 0
-    for r in reversed(results):
-        if r == cur_type:
-            cur_count += 1
-        else:
-            break
-
+    # Single pass: classify each trade once, track the running streak, and
+    # keep only the last 20 results for the sparkline (deque drops the rest).
+    # The final run IS the current streak, so no backwards rescan is needed.
     best_win = worst_loss = run = 0
-    run_type = results[0]
-    for r in results:
+    run_type = None
+    history = deque(maxlen=20)
+    for t in trades:
+        pnl = t["pnl"]
+        r = "W" if pnl > 0 else ("L" if pnl < 0 else "B")
+        history.append(r)
         if r == run_type:
             run += 1
         else:
-            if run_type == "W": best_win   = max(best_win,   run)
-            if run_type == "L": worst_loss = max(worst_loss, run)
+            if run_type == "W":   best_win   = max(best_win,   run)
+            elif run_type == "L": worst_loss = max(worst_loss, run)
             run_type, run = r, 1
-    if run_type == "W": best_win   = max(best_win,   run)
-    if run_type == "L": worst_loss = max(worst_loss, run)
-
-    # Last 20 results for the sparkline
-    history = results[-20:]
+    if run_type == "W":   best_win   = max(best_win,   run)
+    elif run_type == "L": worst_loss = max(worst_loss, run)
 
     return {
-        "current":      cur_count if cur_type != "B" else 0,
-        "current_type": cur_type,
+        "current":      run if run_type != "B" else 0,
+        "current_type": run_type,
         "best_win":     best_win,
         "worst_loss":   worst_loss,
-        "history":      history,
+        "history":      list(history),
     }
 
 
 def get_analytics(account_id=None, date_from=None, date_to=None):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         # Build filter clauses
         conditions_tag = []   # for queries that already have WHERE (tag joins)
         conditions_day = []   # for queries where trading_days is the base
 
+        # All filters are bound parameters so each SQL string is identical
+        # across accounts/ranges and SQLite's prepared-statement cache hits.
+        filter_params = []
         if account_id:
-            aid = int(account_id)
-            conditions_tag.append(f"d.account_id = {aid}")
-            conditions_day.append(f"d.account_id = {aid}")
+            conditions_tag.append("d.account_id = ?")
+            conditions_day.append("d.account_id = ?")
+            filter_params.append(int(account_id))
         if date_from:
             conditions_tag.append("d.date >= ?")
             conditions_day.append("d.date >= ?")
+            filter_params.append(date_from)
         if date_to:
             conditions_tag.append("d.date <= ?")
             conditions_day.append("d.date <= ?")
-
-        # Parameter lists (date_from/date_to only — account_id is inlined)
-        date_params = []
-        if date_from: date_params.append(date_from)
-        if date_to:   date_params.append(date_to)
+            filter_params.append(date_to)
 
         p_filter_tag = (" AND " + " AND ".join(conditions_tag)) if conditions_tag else ""
         p_filter_day = ("WHERE " + " AND ".join(conditions_day)) if conditions_day else ""
 
-        tag_stats = conn.execute(f"""
+        tag_stats = [dict(r) for r in conn.execute(f"""
             SELECT tt.group_id, tt.tag,
                    COUNT(t.id) AS total,
-                   SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) AS wins,
+                   SUM(t.pnl > 0) AS wins,
                    ROUND(AVG(t.pnl), 2)  AS avg_pnl,
                    ROUND(SUM(t.pnl), 2)  AS total_pnl,
-                   ROUND(100.0 * SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) / COUNT(t.id), 1) AS win_rate
+                   ROUND(100.0 * SUM(t.pnl > 0) / COUNT(t.id), 1) AS win_rate
             FROM trade_tags tt
             JOIN trades t        ON t.id = tt.trade_id
             JOIN trading_days d  ON d.id = t.day_id
             WHERE 1=1 {p_filter_tag}
             GROUP BY tt.group_id, tt.tag
             ORDER BY tt.group_id, avg_pnl DESC
-        """, date_params).fetchall()
+        """, filter_params)]
 
-        time_stats = conn.execute(f"""
+        time_stats = [dict(r) for r in conn.execute(f"""
             SELECT CAST(SUBSTR(t.entry_time, 1, 2) AS INTEGER) AS hour,
                    COUNT(*) AS total,
                    ROUND(AVG(t.pnl), 2) AS avg_pnl,
-                   SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) AS wins
+                   SUM(t.pnl > 0) AS wins
             FROM trades t
             JOIN trading_days d ON d.id = t.day_id
             {p_filter_day}
             GROUP BY hour ORDER BY hour
-        """, date_params).fetchall()
+        """, filter_params)]
 
-        daily = conn.execute(f"""
+        daily = [dict(r) for r in conn.execute(f"""
             SELECT d.date,
                    COUNT(t.id) AS trades,
                    ROUND(SUM(t.pnl), 2) AS pnl,
-                   SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) AS wins
+                   SUM(t.pnl > 0) AS wins
             FROM trading_days d
             JOIN trades t ON t.day_id = d.id
             {p_filter_day}
             GROUP BY d.id ORDER BY d.date
-        """, date_params).fetchall()
+        """, filter_params)]
 
         overall_row = conn.execute(f"""
             SELECT COUNT(*) as total_trades,
                    ROUND(COALESCE(SUM(t.pnl), 0), 2) as total_pnl,
                    ROUND(AVG(t.pnl), 2) as avg_pnl,
-                   SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) as wins,
+                   SUM(t.pnl > 0) as wins,
                    ROUND(MAX(t.pnl), 2) as best_trade,
                    ROUND(MIN(t.pnl), 2) as worst_trade,
                    ROUND(AVG(CASE WHEN t.pnl > 0 THEN t.pnl END), 2) as avg_win,
@@ -1504,7 +1859,7 @@ def get_analytics(account_id=None, date_from=None, date_to=None):
             FROM trades t
             JOIN trading_days d ON d.id = t.day_id
             {p_filter_day}
-        """, date_params).fetchone()
+        """, filter_params).fetchone()
 
         overall = dict(overall_row) if overall_row else {}
 
@@ -1526,33 +1881,33 @@ def get_analytics(account_id=None, date_from=None, date_to=None):
                 SELECT COUNT(DISTINCT d.id)
                 FROM trading_days d JOIN trades t ON t.day_id = d.id
                 {p_filter_day}
-            """, date_params).fetchone()[0]
+            """, filter_params).fetchone()[0]
             overall["total_days"] = day_count
 
-        dow_stats = conn.execute(f"""
+        dow_stats = [dict(r) for r in conn.execute(f"""
             SELECT CAST(STRFTIME('%w', d.date) AS INTEGER) AS dow,
                    COUNT(t.id)  AS total,
                    ROUND(SUM(t.pnl),  2) AS total_pnl,
                    ROUND(AVG(t.pnl),  2) AS avg_pnl,
-                   SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) AS wins
+                   SUM(t.pnl > 0) AS wins
             FROM trades t
             JOIN trading_days d ON d.id = t.day_id
             {p_filter_day}
             GROUP BY dow ORDER BY dow
-        """, date_params).fetchall()
+        """, filter_params)]
 
-        # All trades ordered by date+time — used for streaks, equity curve, duration
-        all_trades = conn.execute(f"""
-            SELECT t.id, t.pnl, t.entry_time, t.exit_time, t.direction, t.qty,
-                   t.avg_entry, t.avg_exit, t.execution_json,
+        # All trades ordered by date+time — used for streaks, equity curve,
+        # duration, and score data. Only the columns those consumers read are
+        # fetched; in particular the execution_json blobs stay in SQLite.
+        all_trades_list = [dict(r) for r in conn.execute(f"""
+            SELECT t.pnl, t.entry_time, t.exit_time, t.direction,
                    t.execution_score_json, t.trade_num, t.notes,
                    d.date, d.day_score
             FROM trades t
             JOIN trading_days d ON d.id = t.day_id
             {p_filter_day}
             ORDER BY d.date, t.entry_time
-        """, date_params).fetchall()
-        all_trades_list = [dict(r) for r in all_trades]
+        """, filter_params)]
 
         # Build score_data for Macro/Micro analytics
         score_data = []
@@ -1606,17 +1961,17 @@ def get_analytics(account_id=None, date_from=None, date_to=None):
         duration_stats = _compute_duration_stats(all_trades_list)
 
         # Calendar data — daily P&L keyed by date (reuse daily query)
-        calendar = [dict(r) for r in daily]
+        calendar = daily
 
         # Tag correlation analysis — find co-occurring tag combos across groups
-        tag_correlations = _compute_tag_correlations(conn, p_filter_tag, date_params, overall)
+        tag_correlations = _compute_tag_correlations(conn, p_filter_tag, filter_params, overall)
 
         return {
-            "tag_stats":    [dict(r) for r in tag_stats],
-            "time_stats":   [dict(r) for r in time_stats],
-            "daily":        [dict(r) for r in daily],
+            "tag_stats":    tag_stats,
+            "time_stats":   time_stats,
+            "daily":        daily,
             "overall":      overall,
-            "dow_stats":    [dict(r) for r in dow_stats],
+            "dow_stats":    dow_stats,
             "streaks":      streak_data,
             "equity_curve": equity_curve,
             "drawdown":     drawdown,
@@ -1627,7 +1982,7 @@ def get_analytics(account_id=None, date_from=None, date_to=None):
         }
 
 
-def _compute_tag_correlations(conn, p_filter_tag, date_params, overall):
+def _compute_tag_correlations(conn, p_filter_tag, filter_params, overall):
     """Find co-occurring tag combinations across different groups and their P&L impact."""
     overall_wr = 0
     if overall and overall.get("total_trades") and overall.get("wins"):
@@ -1638,10 +1993,10 @@ def _compute_tag_correlations(conn, p_filter_tag, date_params, overall):
             SELECT t1.group_id AS group_a, t1.tag AS tag_a,
                    t2.group_id AS group_b, t2.tag AS tag_b,
                    COUNT(DISTINCT t1.trade_id) AS trades,
-                   SUM(CASE WHEN tr.pnl > 0 THEN 1 ELSE 0 END) AS wins,
+                   SUM(tr.pnl > 0) AS wins,
                    ROUND(AVG(tr.pnl), 2) AS avg_pnl,
                    ROUND(SUM(tr.pnl), 2) AS total_pnl,
-                   ROUND(100.0 * SUM(CASE WHEN tr.pnl > 0 THEN 1 ELSE 0 END) / COUNT(DISTINCT t1.trade_id), 1) AS win_rate
+                   ROUND(100.0 * SUM(tr.pnl > 0) / COUNT(DISTINCT t1.trade_id), 1) AS win_rate
             FROM trade_tags t1
             JOIN trade_tags t2 ON t1.trade_id = t2.trade_id
                               AND (t1.group_id < t2.group_id
@@ -1652,7 +2007,7 @@ def _compute_tag_correlations(conn, p_filter_tag, date_params, overall):
             GROUP BY t1.group_id, t1.tag, t2.group_id, t2.tag
             HAVING COUNT(DISTINCT t1.trade_id) >= 3
             ORDER BY win_rate DESC
-        """, date_params).fetchall()
+        """, filter_params).fetchall()
 
         correlations = []
         for r in rows:
@@ -1745,7 +2100,7 @@ def _compute_duration_stats(trades):
 # ── App Configuration ────────────────────────────────────────────────────────
 
 def get_config(key, default=""):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT value FROM app_config WHERE key = ?", (key,)).fetchone()
         return row["value"] if row else default
 
@@ -1755,17 +2110,24 @@ def set_config(key, value):
             "INSERT OR REPLACE INTO app_config (key, value) VALUES (?, ?)",
             (key, str(value))
         )
+    _invalidate_config_caches()
 
 def get_all_config():
-    with get_conn() as conn:
+    global _all_config_cache
+    if _all_config_cache is not None:
+        return _all_config_cache
+    with get_read_conn() as conn:
         rows = conn.execute("SELECT key, value FROM app_config").fetchall()
-        return {r["key"]: r["value"] for r in rows}
+        result = {r["key"]: r["value"] for r in rows}
+        with _config_cache_lock:
+            _all_config_cache = result
+        return result
 
 
 # ── Account Config (per-account key-value settings) ─────────────────────────
 
 def get_account_config(account_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT key, value FROM account_config WHERE account_id = ?",
             (account_id,)
@@ -1811,7 +2173,7 @@ def create_live_trade(account_id, direction, instrument, entry_price, entry_time
 
 
 def get_live_trade(live_trade_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("""
             SELECT lt.*, a.name as account_name, a.color as account_color
             FROM live_trades lt
@@ -1835,24 +2197,36 @@ def get_live_trade(live_trade_id):
         return td
 
 
+def _local_date_to_utc(date_str, days=0):
+    """Local midnight of date_str (+days) as a UTC 'YYYY-MM-DD HH:MM:SS' string.
+
+    live_trades.created_at is stored in UTC; filtering used to wrap it in
+    date(..., 'localtime'), which forces a full scan because no index can
+    cover a function of the column. Converting the bound instead keeps
+    the predicate a plain range on the stored value.
+    """
+    local_midnight = datetime.fromisoformat(date_str) + timedelta(days=days)
+    return local_midnight.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
 def get_all_live_trades(status=None, date_from=None, date_to=None, account_id=None):
     """
     Get live trades with optional status, date range, and account filters.
     date_from / date_to are ISO date strings (YYYY-MM-DD).
     account_id filters to a single account when provided.
     """
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         conditions = []
         params = []
         if status:
             conditions.append("lt.status = ?")
             params.append(status)
         if date_from:
-            conditions.append("date(lt.created_at, 'localtime') >= ?")
-            params.append(date_from)
+            conditions.append("lt.created_at >= ?")
+            params.append(_local_date_to_utc(date_from))
         if date_to:
-            conditions.append("date(lt.created_at, 'localtime') <= ?")
-            params.append(date_to)
+            conditions.append("lt.created_at < ?")
+            params.append(_local_date_to_utc(date_to, days=1))
         if account_id:
             conditions.append("lt.account_id = ?")
             params.append(account_id)
@@ -1867,17 +2241,64 @@ def get_all_live_trades(status=None, date_from=None, date_to=None, account_id=No
         return [dict(r) for r in rows]
 
 
+# Columns update_live_trade may touch. Interpolating raw kwarg names into
+# the SET clause would otherwise be an injection hole, and validating here
+# also lets the statement text be memoized per field combination so the
+# hot tick-update path reuses one prepared statement.
+_LIVE_TRADE_UPDATE_COLS = frozenset({
+    "account_id", "status", "direction", "instrument", "entry_price",
+    "entry_time", "total_qty", "mode", "notes", "notes_monitoring",
+    "notes_exit", "tags_json", "guard_json", "execution_score_json",
+    "closed_at", "realized_pnl", "initial_risk", "journal_trade_id",
+    "weighted_avg_entry", "open_qty", "context_id", "strength_id",
+})
+_live_trade_update_sql = {}
+
+
+def get_all_live_trades_full(status=None, date_from=None, date_to=None, account_id=None):
+    """get_all_live_trades plus levels and executions, hydrated in bulk.
+
+    The live pages used to call get_live_trade per row (1 + 3N queries);
+    this fetches the list, then all levels and executions in one
+    IN (...) query each and stitches them in Python — four queries total
+    regardless of trade count.
+    """
+    trades = get_all_live_trades(status, date_from, date_to, account_id)
+    if not trades:
+        return trades
+    ids = [t["id"] for t in trades]
+    placeholders = ",".join("?" * len(ids))
+    levels_by_trade = defaultdict(list)
+    execs_by_trade = defaultdict(list)
+    with get_read_conn() as conn:
+        for r in conn.execute(
+            f"SELECT * FROM live_trade_levels WHERE live_trade_id IN ({placeholders}) "
+            "ORDER BY level_type, sort_order, portion", ids
+        ):
+            levels_by_trade[r["live_trade_id"]].append(dict(r))
+        for r in conn.execute(
+            f"SELECT * FROM live_trade_executions WHERE live_trade_id IN ({placeholders}) "
+            "ORDER BY created_at", ids
+        ):
+            execs_by_trade[r["live_trade_id"]].append(dict(r))
+    for t in trades:
+        t["levels"] = levels_by_trade.get(t["id"], [])
+        t["executions"] = execs_by_trade.get(t["id"], [])
+    return trades
+
+
 def update_live_trade(live_trade_id, **kwargs):
-    with get_conn() as conn:
-        sets = []
-        vals = []
-        for k, v in kwargs.items():
-            sets.append(f"{k} = ?")
-            vals.append(v)
-        vals.append(live_trade_id)
-        conn.execute(
-            f"UPDATE live_trades SET {', '.join(sets)} WHERE id = ?", vals
+    bad = set(kwargs) - _LIVE_TRADE_UPDATE_COLS
+    if bad:
+        raise ValueError(f"update_live_trade: unknown column(s) {sorted(bad)}")
+    cols = tuple(sorted(kwargs))
+    sql = _live_trade_update_sql.get(cols)
+    if sql is None:
+        sql = _live_trade_update_sql.setdefault(
+            cols, f"UPDATE live_trades SET {', '.join(c + ' = ?' for c in cols)} WHERE id = ?"
         )
+    with get_conn() as conn:
+        conn.execute(sql, [kwargs[c] for c in cols] + [live_trade_id])
 
 
 def delete_live_trade(live_trade_id):
@@ -1889,13 +2310,13 @@ def set_live_trade_levels(live_trade_id, levels):
     """Replace all levels for a live trade. levels = [{level_type, portion, qty, price, risk_dollars, reward_dollars}]"""
     with get_conn() as conn:
         conn.execute("DELETE FROM live_trade_levels WHERE live_trade_id = ?", (live_trade_id,))
-        for lv in levels:
-            conn.execute("""
-                INSERT INTO live_trade_levels
-                    (live_trade_id, level_type, portion, qty, price, risk_dollars, reward_dollars)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (live_trade_id, lv["level_type"], lv["portion"], lv["qty"],
-                  lv["price"], lv.get("risk_dollars", 0), lv.get("reward_dollars", 0)))
+        conn.executemany("""
+            INSERT INTO live_trade_levels
+                (live_trade_id, level_type, portion, qty, price, risk_dollars, reward_dollars)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(live_trade_id, lv["level_type"], lv["portion"], lv["qty"],
+               lv["price"], lv.get("risk_dollars", 0), lv.get("reward_dollars", 0))
+              for lv in levels])
 
 
 def add_live_trade_execution(live_trade_id, exec_type, portion, qty, price, exec_time, pnl,
@@ -2135,7 +2556,7 @@ def calculate_net_risk(live_trade_id):
     """Net risk = realized_pnl minus the loss if ALL open contracts hit their stops.
     Sums per-stop loss magnitudes so trailing-stop locked profit on one lot doesn't
     cancel risk on another."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         trade = conn.execute(
             "SELECT direction, instrument, weighted_avg_entry, open_qty, realized_pnl "
             "FROM live_trades WHERE id = ?",
@@ -2189,7 +2610,7 @@ def upsert_shadow_trade(source_trade_id, account_id, projected_qty, projected_in
 
 
 def get_shadows_for_trade(source_trade_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute("""
             SELECT s.*, a.name as account_name, a.color as account_color,
                    a.account_size
@@ -2201,7 +2622,7 @@ def get_shadows_for_trade(source_trade_id):
 
 
 def get_shadows_for_account(account_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute("""
             SELECT s.*, t.direction, t.avg_entry, t.avg_exit, t.entry_time, t.exit_time,
                    t.notes, t.notes_monitoring, t.notes_exit,
@@ -2221,7 +2642,7 @@ def delete_shadows_for_trade(source_trade_id):
 
 
 def get_primary_account():
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT * FROM accounts WHERE is_primary = 1").fetchone()
         return dict(row) if row else None
 
@@ -2229,7 +2650,7 @@ def get_primary_account():
 def get_primary_account_id():
     """Resolve a default account id: the primary account, else the first by name,
     else None (no accounts exist yet)."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute(
             "SELECT id FROM accounts ORDER BY is_primary DESC, name LIMIT 1"
         ).fetchone()
@@ -2238,7 +2659,7 @@ def get_primary_account_id():
 
 def get_all_account_summaries():
     """Get summary stats for each account including shadow trade data."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         accounts = conn.execute("SELECT * FROM accounts ORDER BY is_primary DESC, name").fetchall()
         summaries = []
         for p in accounts:
@@ -2250,7 +2671,7 @@ def get_all_account_summaries():
                 stats = conn.execute("""
                     SELECT COUNT(t.id) as trade_count,
                            ROUND(COALESCE(SUM(t.pnl), 0), 2) as total_pnl,
-                           SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) as wins
+                           SUM(t.pnl > 0) as wins
                     FROM trades t
                     JOIN trading_days d ON d.id = t.day_id
                     WHERE d.account_id = ?
@@ -2260,7 +2681,7 @@ def get_all_account_summaries():
                 stats = conn.execute("""
                     SELECT COUNT(s.id) as trade_count,
                            ROUND(COALESCE(SUM(s.projected_pnl), 0), 2) as total_pnl,
-                           SUM(CASE WHEN s.projected_pnl > 0 THEN 1 ELSE 0 END) as wins
+                           SUM(s.projected_pnl > 0) as wins
                     FROM shadow_trades s
                     WHERE s.account_id = ?
                 """, (pid,)).fetchone()
@@ -2282,7 +2703,7 @@ def get_all_account_summaries():
 
 def get_shadow_equity_curve(account_id):
     """Get equity curve for a shadow account based on shadow trades."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute("""
             SELECT d.date, t.entry_time as time, s.projected_pnl as pnl
             FROM shadow_trades s
@@ -2307,7 +2728,7 @@ def get_shadow_equity_curve(account_id):
 
 def get_cross_account_trades(limit=50):
     """Get recent trades with P&L across all accounts (primary + shadows)."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         # Get primary account trades
         primary = get_primary_account()
         if not primary:
@@ -2371,7 +2792,7 @@ def update_day_notes(day_id, **fields):
 
 
 def get_day_images(day_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM day_images WHERE day_id = ? ORDER BY uploaded_at", (day_id,)
         ).fetchall()
@@ -2403,13 +2824,13 @@ def update_day_image_caption(image_id, caption):
 # ── Setups ───────────────────────────────────────────────────────────────────
 
 def get_all_setups():
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute("""
             SELECT s.*,
                    (SELECT COUNT(*) FROM trade_tags tt
                     JOIN trades t ON t.id = tt.trade_id
                     WHERE tt.group_id = 'setup' AND tt.tag = s.name) AS trade_count,
-                   (SELECT ROUND(100.0 * SUM(CASE WHEN t.pnl > 0 THEN 1 ELSE 0 END) / COUNT(*), 1)
+                   (SELECT ROUND(100.0 * SUM(t.pnl > 0) / COUNT(*), 1)
                     FROM trade_tags tt JOIN trades t ON t.id = tt.trade_id
                     WHERE tt.group_id = 'setup' AND tt.tag = s.name) AS win_rate,
                    (SELECT ROUND(AVG(t.pnl), 2) FROM trade_tags tt JOIN trades t ON t.id = tt.trade_id
@@ -2430,7 +2851,7 @@ def get_all_setups():
 
 
 def get_setup(setup_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT * FROM setups WHERE id = ?", (setup_id,)).fetchone()
         if not row:
             return None
@@ -2486,7 +2907,7 @@ def delete_setup_image(image_id):
 
 
 def get_setup_trades(setup_name, date_from=None, date_to=None):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         conditions = ["tt.group_id = 'setup'", "tt.tag = ?"]
         params = [setup_name]
         if date_from:
@@ -2571,7 +2992,7 @@ def delete_observation(obs_id):
 
 def get_observations(date_from=None, date_to=None, category=None, obs_group=None):
     import json
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         conditions, params = [], []
         if date_from:
             conditions.append("o.date >= ?")
@@ -2641,7 +3062,7 @@ def get_trades_in_range(account_id, date_from, date_to):
     """All trades (with tags + execution score) for an account in [date_from, date_to].
     Used by the weekly-review story engine. Returns dicts ordered by date then trade_num."""
     import json as _json
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         wheres = ["d.date >= ?", "d.date <= ?"]
         params = [date_from, date_to]
         if account_id:
@@ -2688,12 +3109,9 @@ def get_or_create_weekly_review(account_id, week_start):
             ).fetchone()
         if row:
             return dict(row)
-        conn.execute(
-            "INSERT INTO weekly_reviews (account_id, week_start) VALUES (?, ?)",
-            (aid, week_start)
-        )
         row = conn.execute(
-            "SELECT * FROM weekly_reviews WHERE id = last_insert_rowid()"
+            "INSERT INTO weekly_reviews (account_id, week_start) VALUES (?, ?) RETURNING *",
+            (aid, week_start)
         ).fetchone()
         return dict(row)
 
@@ -2724,7 +3142,7 @@ def set_intention_result(intention_id, result):
 
 
 def get_weekly_intentions(review_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM weekly_intentions WHERE weekly_review_id = ? ORDER BY created_at, id",
             (review_id,)
@@ -2741,7 +3159,7 @@ def get_theme_counts(account_id, date_from, date_to):
     """Count observation themes in a date range (observations have no account scope;
     account_id is accepted for signature symmetry but not filtered). Returns
     [{theme, count}] sorted desc, blank themes excluded."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute("""
             SELECT TRIM(theme) AS theme, COUNT(*) AS count
             FROM observations
@@ -2787,7 +3205,7 @@ def upsert_insight_log(account_id, week_start, detector_id, fired, magnitude, co
 def get_insight_history(account_id, detector_id, since_week):
     """Rows for one detector at/after since_week, oldest-first."""
     aid = int(account_id) if account_id else None
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         if aid is None:
             rows = conn.execute(
                 "SELECT * FROM insight_log WHERE account_id IS NULL AND detector_id = ? AND week_start >= ? "
@@ -2805,7 +3223,7 @@ def get_insight_history(account_id, detector_id, since_week):
 
 def get_latest_trade_date(account_id):
     """Most recent trading-day date for an account (ISO), or None."""
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         if account_id:
             row = conn.execute(
                 "SELECT MAX(d.date) FROM trading_days d JOIN trades t ON t.day_id = d.id "
@@ -2822,7 +3240,7 @@ def get_intentions_in_range(account_id, since_week, until_week):
     """Intentions across an account's weekly reviews in [since_week, until_week],
     each carrying its review's week_start. Oldest review first."""
     aid = int(account_id) if account_id else None
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         if aid is None:
             rows = conn.execute("""
                 SELECT i.*, r.week_start AS review_week
@@ -2843,7 +3261,7 @@ def get_intentions_in_range(account_id, since_week, until_week):
 def get_insight_window(account_id, start_week, end_week):
     """All insight_log rows in [start_week, end_week], oldest-first."""
     aid = int(account_id) if account_id else None
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         if aid is None:
             rows = conn.execute(
                 "SELECT * FROM insight_log WHERE account_id IS NULL AND week_start >= ? AND week_start <= ? "
@@ -2887,7 +3305,7 @@ def upsert_internals(day_id, session, **fields):
 
 
 def get_internals_for_day(day_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM market_internals WHERE day_id = ? ORDER BY "
             "CASE session WHEN 'morning' THEN 1 WHEN 'midday' THEN 2 WHEN 'afternoon' THEN 3 END",
@@ -2897,7 +3315,7 @@ def get_internals_for_day(day_id):
 
 
 def get_internals_session(day_id, session):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute(
             "SELECT * FROM market_internals WHERE day_id = ? AND session = ?",
             (day_id, session),
@@ -2948,13 +3366,13 @@ def update_developing_context(ctx_id, **fields):
 
 
 def get_developing_context_by_id(ctx_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT * FROM developing_context WHERE id = ?", (ctx_id,)).fetchone()
         return dict(row) if row else None
 
 
 def get_developing_contexts(date_from, date_to, account_id=None):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         conditions = ["date >= ?", "date <= ?"]
         params = [date_from, date_to]
         if account_id:
@@ -2988,7 +3406,7 @@ def create_trade_strength(context_id, account_id, value, volume, trend,
 
 
 def get_trade_strength(strength_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute(
             "SELECT * FROM trade_strength WHERE id = ?", (strength_id,)
         ).fetchone()
@@ -2996,7 +3414,7 @@ def get_trade_strength(strength_id):
 
 
 def get_trade_strength_by_context(context_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute(
             "SELECT * FROM trade_strength WHERE context_id = ? ORDER BY id DESC LIMIT 1",
             (context_id,)
@@ -3007,7 +3425,7 @@ def get_trade_strength_by_context(context_id):
 # ── Signal Library ────────────────────────────────────────────────────────────
 
 def get_all_signals(active_only=False):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         if active_only:
             rows = conn.execute("SELECT * FROM signal_library WHERE is_active = 1 ORDER BY signal_value").fetchall()
         else:
@@ -3043,7 +3461,7 @@ def delete_signal(signal_id):
 # ── Market Signals ────────────────────────────────────────────────────────────
 
 def get_market_signals_by_context(context_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM market_signals WHERE context_id = ? ORDER BY id",
             (context_id,)
@@ -3073,7 +3491,7 @@ def delete_market_signals_by_context(context_id):
 # ── Trade Plan Legs ──────────────────────────────────────────────────────────
 
 def get_trade_plan_legs_by_context(context_id):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM trade_plan_legs WHERE context_id = ? ORDER BY sort_order, id",
             (context_id,)
@@ -3124,7 +3542,7 @@ def delete_trade_plan_legs_by_context(context_id):
 # ── Headline Helper ─────────────────────────────────────────────────────────
 
 def get_all_headline_helpers():
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
             "SELECT * FROM headline_helper ORDER BY created_at DESC"
         ).fetchall()
@@ -3132,7 +3550,7 @@ def get_all_headline_helpers():
 
 
 def lookup_headline_helper(day_type, value_state, volume_state, htf_trend):
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("""
             SELECT * FROM headline_helper
             WHERE LOWER(day_type) = LOWER(?)
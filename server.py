@@ -4,24 +4,114 @@ Flask routes only. Delegates all logic to app_logic.py and database.py.
 """
 
 from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from datetime import date, datetime, timedelta
 from werkzeug.utils import secure_filename
 import database as db
 import app_logic as logic
-import json, os, uuid
+import hashlib
+import json, os, time, uuid
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
 
 app = Flask(__name__)
 app.config["MAX_CONTENT_LENGTH"] = 32 * 1024 * 1024  # 32 MB
 
+if HAS_ORJSON:
+    # orjson serializes in C straight to bytes — the biggest single cost in
+    # the JSON-heavy routes (/api/analytics, /live recalcs) is stdlib's
+    # encoder, so jsonify and the template *_json context vars go through
+    # it when available. Falls back to stdlib json otherwise.
+    class ORJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
+    def _json_dumps(obj):
+        """Fast dumps for template context vars (returns str)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+else:
+    _json_dumps = json.dumps
+
+if Compress is not None:
+    # gzip/brotli for bodies over 1 KB — the analytics and live-trade JSON
+    # compress 5-10x, which dominates load time on slow links. Responses go
+    # out uncompressed when flask-compress is absent.
+    app.config["COMPRESS_MIN_SIZE"] = 1024
+    Compress(app)
+
 IMAGES_DIR = os.path.join(os.path.dirname(__file__), "data", "images")
 
 ALLOWED_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
+def _save_image_upload(f, prefix, ext):
+    """Stream an image upload to IMAGES_DIR under a content-addressed name.
+
+    Files are named prefix + blake2b(content): identical screenshots
+    re-uploaded to the same record reuse the bytes already on disk, and
+    the old 8-hex uuid slice's birthday-collision risk is gone. Hashing
+    happens while the chunks are written, so nothing is held in memory.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    tmp_path = os.path.join(IMAGES_DIR, f".upload_{uuid.uuid4().hex}")
+    with open(tmp_path, "wb") as out:
+        while True:
+            chunk = f.stream.read(65536)
+            if not chunk:
+                break
+            h.update(chunk)
+            out.write(chunk)
+    unique_name = f"{prefix}_{h.hexdigest()}{ext}"
+    final_path = os.path.join(IMAGES_DIR, unique_name)
+    if os.path.exists(final_path):
+        os.unlink(tmp_path)  # same content already on disk — reuse it
+    else:
+        os.replace(tmp_path, final_path)
+    return unique_name
 
-@app.before_request
-def _ensure_db():
-    db.init_db()
-    os.makedirs(IMAGES_DIR, exist_ok=True)
+
+def _delete_image_file(filename):
+    """Unlink an image unless another record still references it (files are
+    content-addressed, so duplicate uploads share one file)."""
+    if db.image_filename_referenced(filename):
+        return
+    try:
+        os.unlink(os.path.join(IMAGES_DIR, filename))
+    except FileNotFoundError:
+        pass
+
+
+# Instrument field → app_config key, built once instead of re-deriving the
+# f-string keys on every settings save.
+INST_CONFIG_KEYS = {
+    inst: {
+        "dollars_per_point": f"inst_{inst}_dpp",
+        "dollars_per_tick":  f"inst_{inst}_dpt",
+        "ticks_per_point":   f"inst_{inst}_tpp",
+    }
+    for inst in ("MES", "ES")
+}
+
+
+# One-shot init at import time (covers WSGI servers that never run the
+# __main__ block). This used to be an @app.before_request hook, which
+# re-ran the whole CREATE TABLE IF NOT EXISTS / migration sweep plus a
+# makedirs stat on every single request.
+db.init_db()
+os.makedirs(IMAGES_DIR, exist_ok=True)
 
 
 @app.context_processor
@@ -87,7 +177,7 @@ def index():
         account_id=account_id,
         preset=preset,
         today=today.isoformat(),
-        calendar_json=json.dumps(calendar_data),
+        calendar_json=_json_dumps(calendar_data),
     )
 
 
@@ -129,6 +219,7 @@ def day_view(day_id):
             trade["context"] = None
     day_images = db.get_day_images(day_id)
     observations = db.get_observations_for_date(day["date"])
+    tag_groups = logic.get_tag_groups()
     return render_template(
         "day.html",
         day=day,
@@ -136,8 +227,8 @@ def day_view(day_id):
         day_images=day_images,
         observations=observations,
         observation_categories=logic.get_observation_categories(),
-        tag_groups=logic.get_tag_groups(),
-        tags_json=json.dumps(logic.get_tag_groups()),
+        tag_groups=tag_groups,
+        tags_json=_json_dumps(tag_groups),
         day_type_tags=logic.get_day_type_tags(),
         day_value_tags=logic.get_day_value_tags(),
         day_volume_tags=logic.get_day_volume_tags(),
@@ -176,7 +267,7 @@ def trade_view(trade_id):
         "trade.html",
         trade=trade,
         exec_detail=exec_detail,
-        exec_detail_json=json.dumps(exec_detail) if exec_detail else 'null'
+        exec_detail_json=_json_dumps(exec_detail) if exec_detail else 'null'
     )
 
 
@@ -245,10 +336,10 @@ def trade_view_v2(trade_id):
         "trade_v2.html",
         trade=trade,
         exec_detail=exec_detail,
-        exec_detail_json=json.dumps(exec_detail) if exec_detail else "null",
-        exec_score_json=json.dumps(exec_score) if exec_score else "null",
-        siblings_json=json.dumps(siblings),
-        contexts_json=json.dumps(contexts),
+        exec_detail_json=_json_dumps(exec_detail) if exec_detail else "null",
+        exec_score_json=_json_dumps(exec_score) if exec_score else "null",
+        siblings_json=_json_dumps(siblings),
+        contexts_json=_json_dumps(contexts),
     )
 
 
@@ -261,7 +352,6 @@ def analytics():
 
     # Resolve presets to actual dates
     if date_preset != "all" and date_preset != "custom":
-        from datetime import date, timedelta
         today = date.today()
         if date_preset == "week":
             date_from = (today - timedelta(days=today.weekday())).isoformat()
@@ -281,7 +371,7 @@ def analytics():
     return render_template(
         "analytics.html",
         data=data,
-        data_json=json.dumps(data),
+        data_json=_json_dumps(data),
         accounts=accounts,
         account_id=account_id,
         date_from=date_from or "",
@@ -331,8 +421,8 @@ def settings_view():
         "settings.html",
         tag_groups=tag_groups,
         defaults=defaults,
-        defaults_json=json.dumps(all_defaults),
-        tag_groups_json=json.dumps(tag_groups),
+        defaults_json=_json_dumps(all_defaults),
+        tag_groups_json=_json_dumps(tag_groups),
         obs_cat_group=obs_cat_group,
         obs_group_group=obs_group_group,
         day_type_group=day_type_group,
@@ -342,9 +432,9 @@ def settings_view():
         trade_defaults=trade_defaults,
         instrument_config=instrument_config,
         accounts=accounts,
-        accounts_json=json.dumps(accounts),
+        accounts_json=_json_dumps(accounts),
         signals=db.get_all_signals(),
-        signals_json=json.dumps(db.get_all_signals()),
+        signals_json=_json_dumps(db.get_all_signals()),
         headline_helpers=db.get_all_headline_helpers(),
     )
 
@@ -352,14 +442,12 @@ def settings_view():
 @app.route("/live")
 def live_trade_page():
     """New Ticket UI — single-page live trade interface with date range filter."""
-    from datetime import date as dt_date, timedelta
-
     # Parse date range from query params
     range_key = request.args.get("range", "today")
     custom_from = request.args.get("from", "")
     custom_to = request.args.get("to", "")
 
-    today = dt_date.today()
+    today = date.today()
     if range_key == "today":
         date_from = date_to = today.isoformat()
     elif range_key == "yesterday":
@@ -378,51 +466,46 @@ def live_trade_page():
         date_from = date_to = today.isoformat()
 
     account_id = request.args.get("account")
-    open_trades  = db.get_all_live_trades(status="open", date_from=date_from, date_to=date_to, account_id=account_id)
-    closed_trades = db.get_all_live_trades(status="closed", date_from=date_from, date_to=date_to, account_id=account_id)
+    open_trades  = db.get_all_live_trades_full(status="open", date_from=date_from, date_to=date_to, account_id=account_id)
+    closed_trades = db.get_all_live_trades_full(status="closed", date_from=date_from, date_to=date_to, account_id=account_id)
 
     # Pre-compute calc for each trade (open and closed)
     for t in open_trades + closed_trades:
-        full = db.get_live_trade(t["id"])
-        t["levels"] = full.get("levels", [])
-        t["executions"] = full.get("executions", [])
-        t["calc"] = logic.recalculate_live_trade(full)
+        t["calc"] = logic.recalculate_live_trade(t)
 
     contexts = db.get_developing_contexts(date_from, date_to, account_id)
 
+    tag_groups = logic.get_tag_groups()
+    trade_defaults = logic.get_trade_defaults()
     return render_template(
         "live_ticket.html",
         open_trades=open_trades,
         closed_trades=closed_trades,
-        tag_groups=logic.get_tag_groups(),
-        tags_json=json.dumps(logic.get_tag_groups()),
-        trade_defaults=logic.get_trade_defaults(),
-        trade_defaults_json=json.dumps(logic.get_trade_defaults()),
-        instrument_config_json=json.dumps(logic.get_instrument_config()),
+        tag_groups=tag_groups,
+        tags_json=_json_dumps(tag_groups),
+        trade_defaults=trade_defaults,
+        trade_defaults_json=_json_dumps(trade_defaults),
+        instrument_config_json=_json_dumps(logic.get_instrument_config()),
         active_range=range_key,
         date_from=date_from,
         date_to=date_to,
         contexts=contexts,
-        contexts_json=json.dumps(contexts),
+        contexts_json=_json_dumps(contexts),
     )
 
 
 @app.route("/live-v2")
 def live_trade_v2_page():
     """Ladder-based trade companion tool — phase-driven UI."""
-    from datetime import date as dt_date
-    today = dt_date.today()
+    today = date.today()
     date_from = date_to = today.isoformat()
     account_id = request.args.get("account") or None
 
-    open_trades = db.get_all_live_trades(status="open", date_from=date_from, date_to=date_to, account_id=account_id)
-    closed_trades = db.get_all_live_trades(status="closed", date_from=date_from, date_to=date_to, account_id=account_id)
+    open_trades = db.get_all_live_trades_full(status="open", date_from=date_from, date_to=date_to, account_id=account_id)
+    closed_trades = db.get_all_live_trades_full(status="closed", date_from=date_from, date_to=date_to, account_id=account_id)
 
     for t in open_trades + closed_trades:
-        full = db.get_live_trade(t["id"])
-        t["levels"] = full.get("levels", [])
-        t["executions"] = full.get("executions", [])
-        t["calc"] = logic.recalculate_live_trade(full)
+        t["calc"] = logic.recalculate_live_trade(t)
         # POC dynamic-trade-model: also inject net_risk + per-execution open_qty_after
         # so the initial page render has the same shape as /api/live/<id>. Without this,
         # the browser's trade.netRisk falls back to null on first load and the center
@@ -450,14 +533,14 @@ def live_trade_v2_page():
 
     return render_template("live_v2.html",
         open_trades=open_trades, closed_trades=closed_trades,
-        contexts=contexts, contexts_json=json.dumps(contexts),
-        tags_json=json.dumps(logic.get_tag_groups()),
-        trade_defaults_json=json.dumps(logic.get_trade_defaults()),
-        instrument_config_json=json.dumps(logic.get_instrument_config()),
-        open_trades_json=json.dumps(open_trades),
-        closed_trades_json=json.dumps(closed_trades),
-        strength_json=json.dumps(strength_map),
-        signal_library_json=json.dumps(signal_library),
+        contexts=contexts, contexts_json=_json_dumps(contexts),
+        tags_json=_json_dumps(logic.get_tag_groups()),
+        trade_defaults_json=_json_dumps(logic.get_trade_defaults()),
+        instrument_config_json=_json_dumps(logic.get_instrument_config()),
+        open_trades_json=_json_dumps(open_trades),
+        closed_trades_json=_json_dumps(closed_trades),
+        strength_json=_json_dumps(strength_map),
+        signal_library_json=_json_dumps(signal_library),
     )
 
 
@@ -477,13 +560,14 @@ def live_trade_list_legacy():
 @app.route("/live-legacy/new")
 def live_trade_new_legacy():
     account_id = request.args.get("account") or None
+    tag_groups = logic.get_tag_groups()
     return render_template(
         "live_entry_legacy.html",
         trade=None,
-        tag_groups=logic.get_tag_groups(),
-        tags_json=json.dumps(logic.get_tag_groups()),
+        tag_groups=tag_groups,
+        tags_json=_json_dumps(tag_groups),
         trade_defaults=logic.get_trade_defaults(),
-        instrument_config_json=json.dumps(logic.get_instrument_config()),
+        instrument_config_json=_json_dumps(logic.get_instrument_config()),
         account_id=account_id,
     )
 
@@ -494,15 +578,16 @@ def live_trade_view_legacy(live_trade_id):
     if not trade:
         return render_template("404.html", message=f"Live trade #{live_trade_id} not found"), 404
     calc = logic.recalculate_live_trade(trade)
+    tag_groups = logic.get_tag_groups()
     return render_template(
         "live_entry_legacy.html",
         trade=trade,
         calc=calc,
-        calc_json=json.dumps(calc),
-        tag_groups=logic.get_tag_groups(),
-        tags_json=json.dumps(logic.get_tag_groups()),
+        calc_json=_json_dumps(calc),
+        tag_groups=tag_groups,
+        tags_json=_json_dumps(tag_groups),
         trade_defaults=logic.get_trade_defaults(),
-        instrument_config_json=json.dumps(logic.get_instrument_config()),
+        instrument_config_json=_json_dumps(logic.get_instrument_config()),
         account_id=trade.get("account_id") or None,
     )
 
@@ -511,23 +596,49 @@ def live_trade_view_legacy(live_trade_id):
 
 @app.route("/images/<path:filename>")
 def serve_image(filename):
-    return send_from_directory(IMAGES_DIR, filename)
+    # Saved filenames embed a uuid slice, so the content behind a URL never
+    # changes — mark them immutable and let conditional GETs 304.
+    resp = send_from_directory(IMAGES_DIR, filename, conditional=True)
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
 
 
 # ── API: Import ───────────────────────────────────────────────────────────────
 
+_error_body_cache = {}
+
+
+def _err(message, status):
+    """Canned JSON error response.
+
+    Validation failures are the hottest error path; caching the encoded
+    body per message skips the dict build and JSON encode on every miss.
+    """
+    body = _error_body_cache.get(message)
+    if body is None:
+        body = _error_body_cache.setdefault(
+            message, _json_dumps({"error": message}).encode()
+        )
+    return app.response_class(body, status=status, mimetype="application/json")
+
+
 @app.route("/api/import", methods=["POST"])
 def api_import():
     if "file" not in request.files:
-        return jsonify({"error": "No file uploaded"}), 400
+        return _err("No file uploaded", 400)
     f = request.files["file"]
     if not f.filename:
-        return jsonify({"error": "Empty filename"}), 400
+        return _err("Empty filename", 400)
     account_id = request.form.get("account_id") or None
     if account_id:
-        account_id = int(account_id)
+        try:
+            account_id = int(account_id)
+        except ValueError:
+            return _err("account_id must be an integer", 422)
     try:
-        result = logic.import_file(f.filename, f.read(), account_id)
+        # Hand the spooled upload stream to the parser instead of reading
+        # the whole file into memory here.
+        result = logic.import_file(f.filename, f.stream, account_id)
         return jsonify(result)
     except ValueError as e:
         return jsonify({"error": str(e)}), 422
@@ -590,15 +701,13 @@ def api_save_notes(trade_id):
 @app.route("/api/trade/<int:trade_id>/images", methods=["POST"])
 def api_upload_image(trade_id):
     if "image" not in request.files:
-        return jsonify({"error": "No image file"}), 400
+        return _err("No image file", 400)
     f = request.files["image"]
     ext = os.path.splitext(f.filename)[1].lower()
     if ext not in ALLOWED_IMAGE_EXTS:
         return jsonify({"error": f"File type {ext} not allowed. Use JPG, PNG, GIF or WebP."}), 422
 
-    # Save with a unique name to avoid collisions
-    unique_name = f"trade_{trade_id}_{uuid.uuid4().hex[:8]}{ext}"
-    f.save(os.path.join(IMAGES_DIR, unique_name))
+    unique_name = _save_image_upload(f, f"trade_{trade_id}", ext)
 
     caption  = request.form.get("caption", "")
     image_id = db.add_trade_image(trade_id, unique_name, caption)
@@ -623,9 +732,7 @@ def api_update_caption(image_id):
 def api_delete_image(image_id):
     filename = db.delete_trade_image(image_id)
     if filename:
-        path = os.path.join(IMAGES_DIR, filename)
-        if os.path.exists(path):
-            os.remove(path)
+        _delete_image_file(filename)
     return jsonify({"ok": True})
 
 
@@ -688,45 +795,86 @@ def api_regenerate_shadows():
     return jsonify({"ok": True, "trades_processed": count})
 
 
+# Serialized-response cache for settings GETs whose payloads only change
+# through their own save/reset endpoints. Writers bump the version; the
+# read path re-encodes only when its cached version is stale, otherwise
+# the stored bytes go straight out without a dict build or JSON encode.
+_settings_versions = {"tags": 0, "theme": 0}
+_settings_body_cache = {}
+
+
+def _bump_settings(key):
+    _settings_versions[key] += 1
+
+
+def _settings_response(key, build):
+    version = _settings_versions[key]
+    cached = _settings_body_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, _json_dumps(build()).encode())
+        _settings_body_cache[key] = cached
+    return app.response_class(cached[1], mimetype="application/json")
+
+
 @app.route("/api/settings/theme", methods=["POST"])
 def api_save_theme():
     body = request.get_json(silent=True) or {}
     theme = body.get("theme", "mint")
     db.set_config("theme", theme)
+    _bump_settings("theme")
     return jsonify({"ok": True})
 
 
 @app.route("/api/settings/theme", methods=["GET"])
 def api_get_theme():
-    config = db.get_all_config()
-    return jsonify({"theme": config.get("theme", "mint")})
+    return _settings_response(
+        "theme", lambda: {"theme": db.get_all_config().get("theme", "mint")}
+    )
 
 
 # ── API: Analytics ────────────────────────────────────────────────────────────
 
+# Analytics is the largest JSON payload in the app and only changes when
+# trades do; a short TTL on the encoded bytes absorbs dashboard polling
+# and tab switches without risking visibly stale numbers.
+_ANALYTICS_TTL_SECS = 30
+_analytics_body_cache = {}  # account_id -> (expires_at, encoded bytes)
+
+
 @app.route("/api/analytics")
 def api_analytics():
     account_id = request.args.get("account") or None
-    return jsonify(db.get_analytics(account_id=account_id))
+    now = time.monotonic()
+    cached = _analytics_body_cache.get(account_id)
+    if cached is None or cached[0] <= now:
+        body = _json_dumps(db.get_analytics(account_id=account_id)).encode()
+        cached = (now + _ANALYTICS_TTL_SECS, body)
+        _analytics_body_cache[account_id] = cached
+    return app.response_class(cached[1], mimetype="application/json")
 
 
 # ── API: DB Admin ─────────────────────────────────────────────────────────────
 
 @app.route("/api/db/export")
 def api_db_export():
-    """Dump entire database as a SQL script."""
-    import sqlite3, io
-    from flask import Response
-    from datetime import datetime
-    conn = sqlite3.connect(db.DB_PATH)
-    buf  = io.StringIO()
-    buf.write(f"-- Trade Journal export\n-- Generated: {datetime.now().isoformat()}\n\n")
-    for line in conn.iterdump():
-        buf.write(line + "\n")
-    conn.close()
-    sql = buf.getvalue()
+    """Dump entire database as a SQL script (streamed line by line)."""
+    import sqlite3
+    from flask import Response, stream_with_context
+
+    def generate():
+        # Connection opened inside the generator so it is closed when the
+        # client disconnects mid-download; lines stream out as iterdump
+        # yields them instead of buffering the whole dump in memory.
+        conn = sqlite3.connect(db.DB_PATH)
+        try:
+            yield f"-- Trade Journal export\n-- Generated: {datetime.now().isoformat()}\n\n"
+            for line in conn.iterdump():
+                yield line + "\n"
+        finally:
+            conn.close()
+
     return Response(
-        sql,
+        stream_with_context(generate()),
         mimetype="text/plain",
         headers={"Content-Disposition": "attachment; filename=tradejournal_backup.sql"}
     )
@@ -736,14 +884,15 @@ def api_db_export():
 def api_db_import():
     """Restore database from an uploaded SQL script."""
     import sqlite3, os, shutil
-    from datetime import datetime
     if "file" not in request.files:
-        return jsonify({"error": "No file uploaded"}), 400
+        return _err("No file uploaded", 400)
     f = request.files["file"]
     if not f.filename.endswith(".sql"):
-        return jsonify({"error": "Please upload a .sql file"}), 422
+        return _err("Please upload a .sql file", 422)
 
-    sql_text = f.read().decode("utf-8")
+    # Stream the upload to disk rather than f.read().decode() — that held
+    # the script in memory twice (bytes + str) for large backups.
+    temp_sql_path = db.DB_PATH + ".import_sql"
 
     # Safety: back up current db before overwriting
     backup_path = db.DB_PATH + f".bak_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -751,27 +900,57 @@ def api_db_import():
         shutil.copy2(db.DB_PATH, backup_path)
 
     try:
+        f.save(temp_sql_path)
         # Delete existing DB file and recreate from the SQL dump
-        import tempfile
         # Write SQL to a temp db first to validate it works
         temp_path = db.DB_PATH + ".import_tmp"
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
         conn = sqlite3.connect(temp_path)
-        conn.executescript(sql_text)
-        conn.close()
-
-        # Success — replace the real DB
-        if os.path.exists(db.DB_PATH):
-            os.remove(db.DB_PATH)
+        try:
+            with open(temp_sql_path, "r", encoding="utf-8") as fh:
+                conn.executescript(fh.read())
+        finally:
+            conn.close()
+
+        # Success — replace the real DB and drop cached connections so no
+        # thread keeps reading the old file handle. The -wal/-shm sidecars
+        # must go with the DB file: a leftover hot WAL (e.g. checkpointed
+        # by nobody because another thread still held a connection) would
+        # be replayed over the restored file, resurrecting the old data.
+        db.reset_connections()
+        for stale in (db.DB_PATH, db.DB_PATH + "-wal", db.DB_PATH + "-shm"):
+            try:
+                os.unlink(stale)
+            except FileNotFoundError:
+                pass
         shutil.move(temp_path, db.DB_PATH)
+        db.reset_connections()
+
+        # reset_connections flushes the DB-layer config memos, but the
+        # restored file carries its own tags/config and the layers above
+        # cache independently — flush them too or the tag UI and settings
+        # endpoints keep serving the pre-restore data until a tag edit.
+        logic.bump_tag_config_generation()
+        logic.invalidate_config_cache()
+        _bump_settings("tags")
+        _bump_settings("theme")
+        _analytics_body_cache.clear()
 
         return jsonify({"ok": True, "message": "Database restored successfully."})
     except Exception as e:
         # Restore backup on failure
         if os.path.exists(backup_path):
             shutil.copy2(backup_path, db.DB_PATH)
+        db.reset_connections()
         return jsonify({"error": f"Import failed: {e}"}), 500
+    finally:
+        try:
+            os.unlink(temp_sql_path)
+        except FileNotFoundError:
+            pass
 
 @app.route("/api/settings/tags/<group_id>", methods=["POST"])
 def api_save_tag_config(group_id):
@@ -780,12 +959,16 @@ def api_save_tag_config(group_id):
     if not isinstance(tags, list):
         return jsonify({"error": "tags must be a list"}), 400
     db.save_tag_config(group_id, [t for t in tags if t.strip()])
+    logic.bump_tag_config_generation()
+    _bump_settings("tags")
     return jsonify({"ok": True, "group_id": group_id, "tags": tags})
 
 
 @app.route("/api/settings/tags/<group_id>/reset", methods=["POST"])
 def api_reset_tag_config(group_id):
     db.reset_tag_config(group_id)
+    logic.bump_tag_config_generation()
+    _bump_settings("tags")
     if group_id == "obs_categories":
         return jsonify({"ok": True, "tags": logic.OBSERVATION_CATEGORIES})
     if group_id == "obs_groups":
@@ -802,7 +985,7 @@ def api_reset_tag_config(group_id):
 
 @app.route("/api/settings/tags", methods=["GET"])
 def api_get_tag_config():
-    return jsonify(logic.get_tag_groups())
+    return _settings_response("tags", logic.get_tag_groups)
 
 
 # ── API: Trade Defaults & Instrument Config ──────────────────────────────────
@@ -813,21 +996,21 @@ def api_save_trade_defaults():
     for key in logic.DEFAULT_TRADE_DEFAULTS:
         if key in body:
             db.set_config(f"td_{key}", body[key])
+    logic.invalidate_config_cache()
     return jsonify({"ok": True})
 
 
 @app.route("/api/settings/instruments", methods=["POST"])
 def api_save_instrument_config():
     body = request.get_json(silent=True) or {}
-    for inst in ["MES", "ES"]:
-        if inst in body:
-            cfg = body[inst]
-            if "dollars_per_point" in cfg:
-                db.set_config(f"inst_{inst}_dpp", cfg["dollars_per_point"])
-            if "dollars_per_tick" in cfg:
-                db.set_config(f"inst_{inst}_dpt", cfg["dollars_per_tick"])
-            if "ticks_per_point" in cfg:
-                db.set_config(f"inst_{inst}_tpp", cfg["ticks_per_point"])
+    for inst, keys in INST_CONFIG_KEYS.items():
+        cfg = body.get(inst)
+        if not cfg:
+            continue
+        for field, config_key in keys.items():
+            if field in cfg:
+                db.set_config(config_key, cfg[field])
+    logic.invalidate_config_cache()
     return jsonify({"ok": True})
 
 
@@ -1597,13 +1780,12 @@ def api_delete_execution(live_id, exec_id):
 @app.route("/api/live/<int:live_id>/images", methods=["POST"])
 def api_upload_live_image(live_id):
     if "image" not in request.files:
-        return jsonify({"error": "No image file"}), 400
+        return _err("No image file", 400)
     f = request.files["image"]
     ext = os.path.splitext(f.filename)[1].lower()
     if ext not in ALLOWED_IMAGE_EXTS:
         return jsonify({"error": f"File type {ext} not allowed"}), 422
-    unique_name = f"live_{live_id}_{uuid.uuid4().hex[:8]}{ext}"
-    f.save(os.path.join(IMAGES_DIR, unique_name))
+    unique_name = _save_image_upload(f, f"live_{live_id}", ext)
     caption = request.form.get("caption", "")
     image_id = db.add_live_trade_image(live_id, unique_name, caption)
     return jsonify({"ok": True, "id": image_id, "url": f"/images/{unique_name}", "caption": caption})
@@ -1618,9 +1800,7 @@ def api_get_live_images(live_id):
 def api_delete_live_image(image_id):
     filename = db.delete_live_trade_image(image_id)
     if filename:
-        path = os.path.join(IMAGES_DIR, filename)
-        if os.path.exists(path):
-            os.remove(path)
+        _delete_image_file(filename)
     return jsonify({"ok": True})
 
 
@@ -1649,13 +1829,12 @@ def api_save_day_notes(day_id):
 @app.route("/api/day/<int:day_id>/images", methods=["POST"])
 def api_upload_day_image(day_id):
     if "image" not in request.files:
-        return jsonify({"error": "No image file"}), 400
+        return _err("No image file", 400)
     f = request.files["image"]
     ext = os.path.splitext(f.filename)[1].lower()
     if ext not in ALLOWED_IMAGE_EXTS:
         return jsonify({"error": f"File type {ext} not allowed"}), 422
-    unique_name = f"day_{day_id}_{uuid.uuid4().hex[:8]}{ext}"
-    f.save(os.path.join(IMAGES_DIR, unique_name))
+    unique_name = _save_image_upload(f, f"day_{day_id}", ext)
     caption = request.form.get("caption", "")
     image_id = db.add_day_image(day_id, unique_name, caption)
     return jsonify({"ok": True, "id": image_id, "url": f"/images/{unique_name}", "caption": caption})
@@ -1672,9 +1851,7 @@ def api_update_day_image_caption(image_id):
 def api_delete_day_image(image_id):
     filename = db.delete_day_image(image_id)
     if filename:
-        path = os.path.join(IMAGES_DIR, filename)
-        if os.path.exists(path):
-            os.remove(path)
+        _delete_image_file(filename)
     return jsonify({"ok": True})
 
 
@@ -1713,8 +1890,7 @@ def api_upsert_internals(day_id, session):
 
 @app.route("/api/today/internals", methods=["GET"])
 def api_get_today_internals():
-    from datetime import date as dt_date
-    today_str = dt_date.today().isoformat()
+    today_str = date.today().isoformat()
     account_id = request.args.get("account") or db.get_primary_account_id()
     day_id = db.upsert_day(today_str, account_id)
     rows = db.get_internals_for_day(day_id)
@@ -1723,10 +1899,9 @@ def api_get_today_internals():
 
 @app.route("/api/today/internals/<session>", methods=["POST"])
 def api_upsert_today_internals(session):
-    from datetime import date as dt_date
     if session not in ("morning", "midday", "afternoon"):
         return jsonify({"error": "Invalid session"}), 400
-    today_str = dt_date.today().isoformat()
+    today_str = date.today().isoformat()
     account_id = request.args.get("account") or db.get_primary_account_id()
     day_id = db.upsert_day(today_str, account_id)
     body = request.get_json(silent=True) or {}
@@ -1760,7 +1935,6 @@ def setup_detail_view(setup_id):
     date_from = request.args.get("from", "")
     date_to = request.args.get("to", "")
     preset = request.args.get("preset", "all")
-    from datetime import timedelta
     today = date.today()
     if preset == "30d":
         date_from = (today - timedelta(days=30)).isoformat()
@@ -1814,13 +1988,12 @@ def api_delete_setup(setup_id):
 @app.route("/api/setup/<int:setup_id>/images", methods=["POST"])
 def api_upload_setup_image(setup_id):
     if "image" not in request.files:
-        return jsonify({"error": "No image file"}), 400
+        return _err("No image file", 400)
     f = request.files["image"]
     ext = os.path.splitext(f.filename)[1].lower()
     if ext not in ALLOWED_IMAGE_EXTS:
         return jsonify({"error": f"File type {ext} not allowed"}), 422
-    unique_name = f"setup_{setup_id}_{uuid.uuid4().hex[:8]}{ext}"
-    f.save(os.path.join(IMAGES_DIR, unique_name))
+    unique_name = _save_image_upload(f, f"setup_{setup_id}", ext)
     caption = request.form.get("caption", "")
     image_id = db.add_setup_image(setup_id, unique_name, caption)
     return jsonify({"ok": True, "id": image_id, "url": f"/images/{unique_name}", "caption": caption})
@@ -1830,9 +2003,7 @@ def api_upload_setup_image(setup_id):
 def api_delete_setup_image(image_id):
     filename = db.delete_setup_image(image_id)
     if filename:
-        path = os.path.join(IMAGES_DIR, filename)
-        if os.path.exists(path):
-            os.remove(path)
+        _delete_image_file(filename)
     return jsonify({"ok": True})
 
 
@@ -1845,7 +2016,6 @@ def observations_view():
     preset = request.args.get("preset", "this_week")
     category = request.args.get("category", "all")
     group = request.args.get("group", "all")
-    from datetime import timedelta
     today = date.today()
     if preset == "this_week":
         date_from = (today - timedelta(days=today.weekday())).isoformat()
@@ -1915,13 +2085,12 @@ def api_delete_observation(obs_id):
 @app.route("/api/observation/<int:obs_id>/images", methods=["POST"])
 def api_upload_observation_image(obs_id):
     if "image" not in request.files:
-        return jsonify({"error": "No image file"}), 400
+        return _err("No image file", 400)
     f = request.files["image"]
     ext = os.path.splitext(f.filename)[1].lower()
     if ext not in ALLOWED_IMAGE_EXTS:
         return jsonify({"error": f"File type {ext} not allowed"}), 422
-    unique_name = f"obs_{obs_id}_{uuid.uuid4().hex[:8]}{ext}"
-    f.save(os.path.join(IMAGES_DIR, unique_name))
+    unique_name = _save_image_upload(f, f"obs_{obs_id}", ext)
     caption = request.form.get("caption", "")
     image_id = db.add_observation_image(obs_id, unique_name, caption)
     return jsonify({"ok": True, "id": image_id, "url": f"/images/{unique_name}", "caption": caption})
@@ -1931,9 +2100,7 @@ def api_upload_observation_image(obs_id):
 def api_delete_obs_image(image_id):
     filename = db.delete_observation_image(image_id)
     if filename:
-        path = os.path.join(IMAGES_DIR, filename)
-        if os.path.exists(path):
-            os.remove(path)
+        _delete_image_file(filename)
     return jsonify({"ok": True})
 
 
@@ -1948,7 +2115,7 @@ def weekly_review_view():
     return render_template(
         "weekly_review.html",
         data=data,
-        data_json=json.dumps(data),
+        data_json=_json_dumps(data),
         accounts=accounts,
         account_id=account_id,
     )
@@ -2029,8 +2196,6 @@ def api_weekly_review_config():
 # ── Entry Point ───────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    db.init_db()
-    os.makedirs(IMAGES_DIR, exist_ok=True)
     port = int(os.environ.get("PORT", 5050))
     print("\n" + "=" * 45)
     print("  Trade Journal is running!")
@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production servers.
+
+Run with gunicorn (installed separately, see requirements.txt):
+
+    gunicorn --worker-class gthread -w 1 --threads 8 -b 127.0.0.1:5050 wsgi:app
+
+One threaded worker fits this app: database.py keeps one SQLite
+connection per OS thread, so each gunicorn thread gets its own handle,
+while the config/tag/settings caches and the write lock are in-process —
+a second worker would miss their invalidations and serve stale settings
+after a save. `python server.py` remains the local dev entry point.
+"""
+
+from server import app  # noqa: F401